@@ -0,0 +1,74 @@
+"""Poll latency of ``IncidentAggregator`` as consoles are added to the pool.
+
+Every console is a stub session that waits 50 ms per request, standing in for the
+round trip to a console, and answers ``incidents/unacknowledged`` from 200 canned
+incidents, honouring ``newer_than``. The first poll fetches everything and the
+following poll only what is newer, which here is nothing.
+
+    PYTHONPATH=. python benchmarks/bench_aggregator.py [incidents per console]
+"""
+import datetime
+import json
+import random
+import sys
+import time
+
+import canarytools
+
+LATENCY = 0.05
+START = datetime.datetime(2020, 1, 1)
+
+
+def incident(i, created):
+    return {'id': 'incident:sshlogin:%d' % i, 'summary': 'SSH Login Attempt', 'description': 'SSH Login Attempt',
+            'node_id': '0000000000231c23', 'acknowledged': 'False', 'events': [],
+            'created_std': created.strftime('%Y-%m-%d %H:%M:%S UTC+0000')}
+
+
+class StubResponse(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StubSession(object):
+    def __init__(self, count):
+        self.incidents = sorted((incident(i, START + datetime.timedelta(seconds=random.randint(0, 86400)))
+                                 for i in range(count)), key=lambda incident: incident['created_std'])
+
+    def request(self, method, url, **kwargs):
+        time.sleep(LATENCY)
+        newer_than = kwargs['params'].get('newer_than')
+        if newer_than:
+            newer_than = datetime.datetime.strptime(newer_than, '%Y-%m-%d-%H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+        incidents = [incident for incident in self.incidents
+                     if not newer_than or incident['created_std'][:19] >= newer_than]
+        return StubResponse(json.dumps({'result': 'success', 'incidents': incidents}))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(0)
+    print('{0:>9}{1:>11}{2:>13}{3:>14}'.format('consoles', 'incidents', 'first poll', 'steady poll'))
+    for consoles in (1, 5, 10, 20, 40):
+        pool = canarytools.ConsolePool(
+            dict(('console%d' % i, canarytools.Console('console%d' % i, 'API_KEY', session=StubSession(count)))
+                 for i in range(consoles)), max_workers=40)
+        aggregator = canarytools.IncidentAggregator(pool)
+        start = time.time()
+        incidents = aggregator.poll()
+        first = time.time() - start
+        start = time.time()
+        aggregator.poll()
+        steady = time.time() - start
+        print('{0:>9}{1:>11}{2:>11.0f}ms{3:>12.0f}ms'.format(consoles, len(incidents), first * 1000, steady * 1000))
+    print('one console after another would take {0:.0f}ms per poll at 40 consoles'.format(40 * LATENCY * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Cost of request logging per ``Console.get``, with debugging off and on.
+
+The console is replaced by a stub session returning a canned 1.8 MB listing, and
+JSON decoding and parsing are stubbed out, so what is left is the request path and
+its logging. With debugging on the records go to a ``NullHandler``, which leaves out
+the cost of writing them anywhere.
+
+    PYTHONPATH=. python benchmarks/bench_logging.py [number]
+"""
+import json
+import logging
+import sys
+import timeit
+
+import canarytools
+from canarytools.console import logger
+
+BODY = json.dumps({'incidents': [{'id': 'incident:%d' % i, 'summary': 'x' * 50} for i in range(20000)]}).encode('utf-8')
+
+
+class StubResponse(object):
+    status_code = 200
+    headers = {}
+
+    @property
+    def text(self):
+        # requests decodes the body again on every access
+        return BODY.decode('utf-8')
+
+    def json(self):
+        return {'result': 'success'}
+
+
+class StubSession(object):
+    def request(self, method, url, **kwargs):
+        return StubResponse()
+
+
+def per_call(console, number):
+    call = lambda: console.get('incidents/all', {}, lambda data: None)
+    return min(timeit.repeat(call, number=number, repeat=5)) / number
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    handlers = logger.handlers
+    logger.handlers = [logging.NullHandler()]
+    try:
+        print('body {0:.1f} MB'.format(len(BODY) / 1e6))
+        for debug in (False, True):
+            console = canarytools.Console('example', 'API_KEY', debug=debug, session=StubSession())
+            print('debug={0!s:<6}{1:>10.1f} us/call'.format(debug, per_call(console, number) * 1e6))
+    finally:
+        logger.handlers = handlers
+
+
+if __name__ == '__main__':
+    main()
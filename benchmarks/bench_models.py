@@ -0,0 +1,67 @@
+"""Memory held by model objects, regular vs compact (``Console(compact=True)``).
+
+Decodes a canned JSON listing of incidents, devices and Canarytokens, builds the
+objects, drops the decoded JSON and reports the bytes still allocated per object
+with tracemalloc. No console is contacted.
+
+    PYTHONPATH=. python benchmarks/bench_models.py [count]
+"""
+import json
+import sys
+import tracemalloc
+
+import canarytools
+
+
+def incident(i):
+    return {'id': 'incident:sshlogin:%d' % i, 'summary': 'SSH Login Attempt', 'description': 'SSH Login Attempt',
+            'node_id': '0000000000231c23', 'src_host': '10.0.0.%d' % (i % 256), 'dst_host': '10.0.1.1',
+            'src_port': '51234', 'dst_port': '22', 'logtype': '4000', 'flock_id': 'flock:default',
+            'acknowledged': 'False', 'created_std': '2020-01-01 10:00:00 UTC+0000',
+            'updated_std': '2020-01-01 10:00:00 UTC+0000', 'events': []}
+
+
+def device(i):
+    return {'id': '%016x' % i, 'name': 'canary-%d' % i, 'description': 'Office', 'device_live': 'True',
+            'ip_address': '10.0.2.%d' % (i % 256), 'mac_address': '00:00:00:00:%02x:%02x' % (i // 256 % 256, i % 256),
+            'flock_id': 'flock:default', 'location': 'Server room', 'sensor': 'canary', 'ippers': 'win2012',
+            'uptime': '1234', 'uptime_age': '20 minutes', 'first_seen_age': '2 days',
+            'last_heartbeat_age': '1 minute', 'first_seen_std': '2020-01-01 10:00:00 UTC+0000',
+            'last_seen_std': '2020-01-02 10:00:00 UTC+0000', 'ghost': 'False', 'need_reboot': 'False',
+            'ignore_notifications_disconnect': 'False', 'ignore_notifications_general': 'False',
+            'notify_after_horizon_reconnect': 'False', 'reconnect_count': '1', 'service_count': '3',
+            'version': '3.1.0', 'device_id_hash': '%032x' % i}
+
+
+def token(i):
+    return {'canarytoken': 'token%021d' % i, 'kind': 'doc-msword', 'memo': 'laptop %d' % i, 'enabled': True,
+            'flock_id': 'flock:default', 'triggered_count': 0, 'created': '1577872800', 'updated_id': 1,
+            'node_id': '00000000deadbeef'}
+
+
+def measure(build, body):
+    tracemalloc.start()
+    objects = [build(item) for item in json.loads(body)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / float(len(objects))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print('python %s, %d objects each' % (sys.version.split()[0], count))
+    cases = [
+        ('incident', incident, lambda console: console.incidents.parse_incident),
+        ('device (listing)', device, lambda console: console.devices._parse_listed),
+        ('canarytoken (listing)', token, lambda console: console.tokens._parse_listed),
+    ]
+    for name, make, parser in cases:
+        body = json.dumps([make(i) for i in range(count)])
+        sizes = [measure(parser(canarytools.Console('example', 'key', compact=compact)), body)
+                 for compact in (False, True)]
+        print('%-22s regular %6.1f B/object  compact %6.1f B/object  (%+.0f%%)' % (
+            name, sizes[0], sizes[1], 100.0 * (sizes[1] - sizes[0]) / sizes[0]))
+
+
+if __name__ == '__main__':
+    main()
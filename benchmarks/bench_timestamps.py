@@ -0,0 +1,32 @@
+"""Decoding a console timestamp: ``dateutil``, ``strptime`` and the fixed-format
+fast path in ``canarytools.models.timestamps``.
+
+    PYTHONPATH=. python benchmarks/bench_timestamps.py [number]
+"""
+import datetime
+import sys
+import timeit
+
+from dateutil.parser import parse
+
+from canarytools.models.timestamps import parse_timestamp
+
+VALUE = '2019-12-25 12:00:00 UTC+0000'
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    candidates = [
+        ('dateutil.parser.parse', lambda: parse(VALUE)),
+        ('datetime.strptime', lambda: datetime.datetime.strptime(VALUE, '%Y-%m-%d %H:%M:%S %Z%z')),
+        ('parse_timestamp', lambda: parse_timestamp(VALUE)),
+    ]
+    assert len(set(func() for _, func in candidates)) == 1
+    print('{0:<24}{1:>12}'.format('', 'us/call'))
+    for name, func in candidates:
+        seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print('{0:<24}{1:>12.2f}'.format(name, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,12 @@
 from .console import Console
+from .aio import AsyncConsole
+from .pool import ConsolePool
+from .aggregator import IncidentAggregator
+from .sync import IncidentSync
+from .mirror import LocalMirror
+from .cache import ResponseCache, ValidatorCache
+from .transport import Transport, RetryPolicy
+from .ratelimit import RateLimiter, TokenBucket
 
 from .exceptions import ConsoleError, ConfigurationError, InvalidAuthTokenError, ConnectionError, \
     DeviceNotFoundError, IncidentNotFoundError, InvalidParameterError, UpdateError, FileNotFound, \
@@ -11,12 +19,12 @@ from .models.incidents import Incident, IncidentDeviceReconnected, IncidentDevic
     IncidentRedisCommand, IncidentUser, IncidentSNMPRequest, IncidentSIPRequest, IncidentSMBFileOpen, \
     IncidentCanarytokenTriggered, IncidentHostPortScan, IncidentNetworkPortScan, IncidentConsolidatedNetworkPortScan,\
     Event
-from .models.canarytokens import CanaryToken, CanaryTokenKinds
+from .models.canarytokens import CanaryToken, CanaryTokenKinds, TokenIndex
 from .models.flocks import Flock
 from .models.devices import Device
 from .models.databundles import DataBundle
 from .models.update import Update
-from .models.result import Result
+from .models.result import Result, BatchResult
 from .models.settings import Settings
 
 
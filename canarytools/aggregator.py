@@ -0,0 +1,105 @@
+import datetime
+import heapq
+import time
+
+from .pool import ConsolePool
+from .models.timestamps import format_newer_than
+
+# sorts incidents without a usable created_std first
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def created_key(incident):
+    """Sort key of an incident by its creation time"""
+    created = getattr(incident, 'created_std', None)
+    return created if isinstance(created, datetime.datetime) else EPOCH
+
+
+class IncidentAggregator(object):
+    def __init__(self, consoles, newer_than=None, event_limit=None, max_workers=None):
+        """Watches the unacknowledged incidents of many consoles as a single feed ordered
+            by creation time. Each poll queries every console in parallel for incidents
+            newer than the last one it returned, and merges the per-console lists with a
+            k-way heap merge. Every incident is tagged with the name of its console in
+            its ``source`` attribute.
+
+        :param consoles: A :class:`ConsolePool <ConsolePool>`, or anything a ConsolePool accepts
+        :param newer_than: Only return incidents created after this datetime, UTC if naive. By default the
+            first poll returns all unacknowledged incidents
+        :param event_limit: Maximum number of events returned with each incident
+        :param max_workers: Maximum number of consoles polled at once. Defaults to the pool's ``max_workers``
+
+        **Attributes:**
+            - **errors (dict)** -- Error of each console whose last poll failed, keyed by console name.
+              A failed console is retried from the same point on the next poll
+
+        Usage::
+
+            >>> import canarytools
+            >>> aggregator = canarytools.IncidentAggregator(canarytools.ConsolePool.from_keys(keys))
+            >>> for incident in aggregator.watch(interval=30):
+            >>>     print(incident.source, incident.created_std, incident.summary)
+        """
+        self.pool = consoles if isinstance(consoles, ConsolePool) else ConsolePool(consoles)
+        self.event_limit = event_limit
+        self.max_workers = max_workers
+        self.errors = {}
+        # per console: newest creation time returned and the ids returned with that time
+        self._marks = {}
+        if newer_than is not None and newer_than.tzinfo is None:
+            newer_than = newer_than.replace(tzinfo=datetime.timezone.utc)
+        self._newer_than = newer_than
+
+    def poll(self):
+        """Fetch the incidents created on any console since the last poll
+
+        :return: New incidents, oldest first
+        :rtype: List of :class:`Incident <Incident>` objects
+        """
+        results = self.pool.map(self._fetch, max_workers=self.max_workers)
+        streams = list()
+        for result in results:
+            if not result.ok:
+                self.errors[result.item] = result.error
+                continue
+            self.errors.pop(result.item, None)
+            for incident in result.result:
+                incident.source = result.item
+            if result.result:
+                streams.append(result.result)
+        return list(heapq.merge(*streams, key=created_key))
+
+    def watch(self, interval=60):
+        """Poll forever, yielding new incidents as they arrive
+
+        :param interval: Seconds between polls
+        :return: Generator of :class:`Incident <Incident>` objects
+        """
+        while True:
+            start = time.time()
+            for incident in self.poll():
+                yield incident
+            time.sleep(max(0, interval - (time.time() - start)))
+
+    def _fetch(self, console):
+        mark, seen = self._marks.get(console, (self._newer_than, frozenset()))
+        newer_than = format_newer_than(mark) if mark is not None else None
+        incidents = console.incidents.unacknowledged(newer_than=newer_than, event_limit=self.event_limit)
+
+        fresh = list()
+        for incident in incidents:
+            # newer_than has second resolution, skip what the last poll already returned
+            if incident.id not in seen:
+                fresh.append(incident)
+        # each console's list must be ordered for the merge
+        fresh.sort(key=created_key)
+
+        if fresh:
+            newest = created_key(fresh[-1])
+            if mark is None or newest > mark:
+                mark = newest
+                seen = frozenset(i.id for i in fresh if created_key(i) == newest)
+            else:
+                seen = seen | frozenset(i.id for i in fresh if created_key(i) == mark)
+            self._marks[console] = (mark, seen)
+        return fresh
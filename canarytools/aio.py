@@ -0,0 +1,431 @@
+import asyncio
+import json
+import logging
+import time
+
+import pytz
+
+try:
+    import aiohttp
+except ImportError:
+    # aiohttp is an optional dependency, install with: pip install canarytools[async]
+    aiohttp = None
+
+from .console import Console, RESULT_SUCCESS
+from .exceptions import ConfigurationError, ConsoleError
+from .models.devices import Devices, Device
+from .models.incidents import Incidents
+from .models.canarytokens import CanaryTokens
+from .models.flocks import Flocks
+from .models.update import Updates
+
+
+class AsyncConsole(object):
+    def __init__(self, domain=None, api_key=None, timezone=pytz.utc, debug=False, debug_level=logging.DEBUG,
+                 max_connections=100, session=None, base_url=None, retry=None, rate_limit=None,
+                 timeout=(10, 60)):
+        """Initialize an AsyncConsole object. Awaitable equivalent of :class:`Console <Console>`
+            for use inside an asyncio event loop. Requests share a single ``aiohttp`` connection pool.
+
+            Objects returned are the regular model classes. Their own methods (e.g. ``incident.acknowledge()``)
+            are bound to a synchronous :class:`Console <Console>` and block when called.
+
+            Devices and Canarytokens from listings only hold the listed fields. Unlike those of a
+            Console they never fetch the rest of their detail when an attribute is accessed, which
+            would block the event loop. Fetch it with ``await console.devices.hydrate(devices)``
+            or ``await console.tokens.hydrate(tokens)``.
+
+        :param domain: The domain of the Canary console
+        :param api_key: The API key received on your Canary console
+        :param timezone: The timezone to be used when displaying objects with datetime information
+        :param debug: Debug flag for debugging requests/responses
+        :param debug_level: Debug level. See :class:`Console <Console>`
+        :param max_connections: Maximum number of simultaneous connections in the pool
+        :param session: Optional pre-configured ``aiohttp.ClientSession``
+        :param base_url: Url of the console's API. See :class:`Console <Console>`
+        :param retry: The :class:`RetryPolicy <RetryPolicy>` to apply. See :class:`Console <Console>`
+        :param rate_limit: A :class:`RateLimiter <RateLimiter>` throttling every attempt, retries included.
+            It may be shared with Console and other AsyncConsole objects, waits don't block the event loop
+        :param timeout: Seconds to wait for the console, either a ``(connect, read)`` tuple or a single
+            value for both. ``None`` waits forever
+
+        :except ConfigurationError: Domain and/or API auth token not set, or aiohttp is not installed
+
+        Usage::
+
+            >>> import canarytools
+            >>> async with canarytools.AsyncConsole(domain='console_domain', api_key='test_key') as console:
+            >>>     incidents = await console.incidents.unacknowledged()
+        """
+        if aiohttp is None:
+            raise ConfigurationError("AsyncConsole requires aiohttp. Install it with: pip install canarytools[async]")
+
+        # synchronous twin. Shares configuration, logging and error handling, and is the
+        # console the returned model objects are bound to
+        self.console = Console(domain, api_key, timezone, debug, debug_level, base_url=base_url, retry=retry,
+                               rate_limit=rate_limit, timeout=timeout)
+
+        self.domain = self.console.domain
+        self.api_key = self.console.api_key
+        self.tz = self.console.tz
+        self.root = self.console.base_url
+
+        self.retry = self.console.transport.retry
+        self.rate_limit = rate_limit
+        if timeout is None:
+            self.timeout = aiohttp.ClientTimeout(total=None)
+        else:
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+        self.max_connections = max_connections
+        self.session = session
+
+        self.devices = AsyncDevices(self)
+        self.incidents = AsyncIncidents(self)
+        self.settings = AsyncSettings(self)
+        self.tokens = AsyncCanaryTokens(self)
+        self.flocks = AsyncFlocks(self)
+        self.updates = AsyncUpdates(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the connection pool"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def ping(self):
+        """Tests the connection to the Canary Console
+
+        :return: Returns ``True`` if a connection could be established
+            and ``False`` otherwise
+        :rtype: bool
+        """
+        result = await self.get('ping', {})
+        return result.result == RESULT_SUCCESS
+
+    async def get(self, url, params, parser=None):
+        """Get request
+
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param parser: The function used to parse JSON data into an specific object
+        :return: Object(s) or a Result Indicator Object
+        """
+        return await self.request('GET', url, params, parser)
+
+    async def post(self, url, params, parser=None, files={}):
+        """Post request
+
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param parser: The function used to parse JSON data into an specific object
+        :param files: Files to be uploaded, as ``{name: (filename, content, mimetype)}``
+        :return: Object(s) or a Result Indicator Object
+        """
+        return await self.request('POST', url, params, parser, files)
+
+    async def delete(self, url, params, parser=None):
+        """Delete request
+
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param parser: The function used to parse JSON data into an specific object
+        :return: Object(s) or a Result Indicator Object
+        """
+        return await self.request('DELETE', url, params, parser)
+
+    async def request(self, method, url, params, parser=None, files=None):
+        """Send a request, retrying transient failures, and handle the response the same
+            way :class:`Console <Console>` does
+
+        :param method: HTTP method
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param parser: The function used to parse JSON data into an specific object
+        :param files: Files to be uploaded with a POST
+        :return: Object(s) or a Result Indicator Object
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+
+        params = self._encode(params)
+        query = {'auth_token': self.api_key}
+        if method != 'POST':
+            query.update(params)
+
+        retryable = self.retry.is_retryable(method, url)
+        attempt = 0
+        try:
+            self.console.log_request(method, url, params)
+            start = time.time()
+            while True:
+                if self.rate_limit is not None:
+                    delay = self.rate_limit.reserve(url)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                try:
+                    async with self.session.request(method, "{0}{1}".format(self.root, url), params=query,
+                                                    data=self._form(method, params, files),
+                                                    timeout=self.timeout) as resp:
+                        body = await resp.read()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if not retryable or attempt >= self.retry.retries:
+                        raise
+                    await asyncio.sleep(self.retry.backoff(attempt))
+                    attempt += 1
+                    continue
+                if retryable and resp.status in self.retry.status_forcelist and attempt < self.retry.retries:
+                    await asyncio.sleep(self.retry.backoff(attempt, resp.headers.get('Retry-After')))
+                    attempt += 1
+                    continue
+                break
+            complete = time.time() - start
+            self.console.log_response(resp.status, complete, lambda: body)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            self.console.throw_connection_error()
+        return self.console.handle_response(self.decode(resp, body), parser)
+
+    def decode(self, resp, body):
+        """Decode the JSON body of a response. See :meth:`Console.decode`
+
+        :param resp: The response
+        :param body: The bytes of the response body
+        :return: The decoded JSON data
+
+        :except ConsoleError: The console didn't return JSON, e.g. a 503 error page
+        """
+        try:
+            return json.loads(body.decode('utf-8'))
+        except ValueError:
+            raise ConsoleError("Unexpected response from console at domain '{domain}': HTTP {status}".format(
+                domain=self.domain, status=resp.status))
+
+    def _form(self, method, params, files):
+        """Body of a POST request, built for every attempt as a sent form can't be sent again"""
+        if method != 'POST':
+            return None
+        data = aiohttp.FormData(params)
+        for name, (filename, content, mimetype) in (files or {}).items():
+            data.add_field(name, content, filename=filename, content_type=mimetype)
+        return data
+
+    def _encode(self, params):
+        """Drop unset parameters and encode values the way ``requests`` does"""
+        return dict((key, str(value)) for key, value in params.items() if value is not None)
+
+    def __repr__(self):
+        return '<AsyncConsole %s>' % self.api_key
+
+
+def _raw(data):
+    """Parser returning the JSON data as is"""
+    return data
+
+
+class AsyncDevices(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`Devices <Devices>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+        self._devices = Devices(console.console)
+
+    async def all(self, hydrate=False):
+        """Get all registered devices. See :meth:`Devices.all`"""
+        return await self._list('devices/all', hydrate)
+
+    async def live(self, hydrate=False):
+        """Get all registered connected devices. See :meth:`Devices.live`"""
+        return await self._list('devices/live', hydrate)
+
+    async def dead(self, hydrate=False):
+        """Get all registered disconnected devices. See :meth:`Devices.dead`"""
+        return await self._list('devices/dead', hydrate)
+
+    async def get_device(self, node_id, settings=False):
+        """Get information on a particular device. See :meth:`Devices.get_device`"""
+        params = {'node_id': node_id, 'settings': settings}
+        data = await self.console.get('device/getinfo', params, _raw)
+        await self._load_incidents([data['device']], refresh=False)
+        return Device.parse(self.console.console, data['device'])
+
+    async def hydrate(self, devices):
+        """Fetch the full detail for devices built from a listing, concurrently
+
+        :param devices: List of :class:`Device <Device>` objects
+        """
+        details = await asyncio.gather(*[self.get_device(device.id) for device in devices])
+        for device, detail in zip(devices, details):
+            device._update(detail)
+            device._hydrated = True
+
+    async def _list(self, url, hydrate):
+        params = {'tz': self.console.tz}
+        data = await self.console.get(url, params, _raw)
+        await self._load_incidents(data.get('devices', []), refresh=True)
+        devices = self._devices.parse(data)
+        if hydrate:
+            await self.hydrate(devices)
+        else:
+            for device in devices:
+                # don't fetch the detail with a blocking request on attribute access
+                device._hydrated = True
+        return devices
+
+    async def _load_incidents(self, devices, refresh):
+        """Fill the console's incident index so devices don't block on it while parsing"""
+        keys = [incident['key'] for device in devices for incident in device.get('unacknowleged_incidents') or []]
+        index = self.console.console.incident_index
+        if keys and (refresh or not index.loaded or any(key not in index for key in keys)):
+            index.load(await self.console.incidents.unacknowledged())
+
+
+class AsyncIncidents(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`Incidents <Incidents>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+        self._incidents = Incidents(console.console)
+
+    async def all(self, node_id=None, event_limit=None, newer_than=None):
+        """Get all incidents for this console. See :meth:`Incidents.all`"""
+        params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        return await self.console.get('incidents/all', params, self._incidents.parse)
+
+    async def unacknowledged(self, node_id=None, event_limit=None, newer_than=None):
+        """Get list of all unacknowledged incidents. See :meth:`Incidents.unacknowledged`"""
+        params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        return await self.console.get('incidents/unacknowledged', params, self._incidents.parse)
+
+    async def acknowledged(self, node_id=None, event_limit=None, newer_than=None):
+        """Get list of all acknowledged incidents. See :meth:`Incidents.acknowledged`"""
+        params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        return await self.console.get('incidents/acknowledged', params, self._incidents.parse)
+
+    async def acknowledge(self, node_id=None, src_host=None, older_than=None):
+        """Mark all incidents as acknowledged. See :meth:`Incidents.acknowledge`"""
+        params = {'node_id': node_id, 'src_host': src_host, 'older_than': older_than}
+        return await self.console.post('incidents/acknowledge', params)
+
+    async def unacknowledge(self, node_id=None, src_host=None, older_than=None):
+        """Mark all incidents as unacknowledged. See :meth:`Incidents.unacknowledge`"""
+        params = {'node_id': node_id, 'src_host': src_host, 'older_than': older_than}
+        return await self.console.post('incidents/unacknowledge', params)
+
+    async def delete(self, node_id=None, src_host=None, older_than=None):
+        """Delete all acknowledged incidents. See :meth:`Incidents.delete`"""
+        params = {'node_id': node_id, 'src_host': src_host, 'older_than': older_than}
+        return await self.console.post('incidents/delete', params)
+
+    async def get_incident(self, incident_id):
+        """Get an Incident. See :meth:`Incidents.get_incident`"""
+        params = {'tz': self.console.tz, 'incident': incident_id}
+        return await self.console.get('incident/fetch', params, self._incidents.parse)
+
+
+class AsyncCanaryTokens(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`CanaryTokens <CanaryTokens>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+        self._tokens = CanaryTokens(console.console)
+
+    async def create(self, memo, kind, **kwargs):
+        """Create a new Canarytoken. Takes the same parameters as :meth:`CanaryTokens.create`"""
+        params, files = self._tokens._create_request(memo, kind, **kwargs)
+        return await self.console.post('canarytoken/create', params, self._tokens.parse, files)
+
+    async def get_token(self, canarytoken):
+        """Gets a single Canarytoken. See :meth:`CanaryTokens.get_token`"""
+        params = {'canarytoken': canarytoken}
+        return await self.console.get('canarytoken/fetch', params, self._tokens.parse)
+
+    async def all(self, include_endpoints=False):
+        """Fetch all Canarytokens. See :meth:`CanaryTokens.all`. Tokens of a light listing only hold the
+            listed fields, fetch the rest with :meth:`hydrate`
+        """
+        params = {'include_endpoints': str(include_endpoints)}
+        return await self.console.get('canarytokens/fetch', params, self._tokens.parse)
+
+    async def hydrate(self, tokens):
+        """Fetch the full detail of tokens from a light listing, concurrently. Only the fields
+            missing from the listing are filled in. See :meth:`CanaryToken.hydrate`
+
+        :param tokens: List of :class:`CanaryToken <CanaryToken>` objects
+        """
+        details = await asyncio.gather(*[self.get_token(token.canarytoken) for token in tokens])
+        for token, detail in zip(tokens, details):
+            listed = token._attributes()
+            for key, value in detail._attributes().items():
+                if key not in listed:
+                    token._set(key, value)
+
+
+class AsyncFlocks(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`Flocks <Flocks>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+        self._flocks = Flocks(console.console)
+
+    async def create(self, name):
+        """Create a new Flock. See :meth:`Flocks.create`"""
+        return await self.console.post('flock/create', {'name': name},
+                                       lambda data: self._flocks.parse_created(data, name))
+
+    async def all(self):
+        """Fetch all Flocks. See :meth:`Flocks.all`"""
+        return await self.console.get('flocks/list', {}, self._flocks.parse)
+
+
+class AsyncSettings(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`Settings <Settings>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+
+    async def is_ip_whitelisted(self, src_ip):
+        """Is IP address Whitelisted. See :meth:`Settings.is_ip_whitelisted`"""
+        params = {'src_ip': src_ip}
+        result = await self.console.get('settings/is_ip_whitelisted', params)
+        return bool(result.is_ip_whitelisted)
+
+    async def whitelist_ip_port(self, src_ip, dst_port=None):
+        """Whitelist IP address and port. See :meth:`Settings.whitelist_ip_port`"""
+        params = {'src_ip': src_ip, 'dst_port': dst_port}
+        return await self.console.post('settings/whitelist_ip_port', params)
+
+
+class AsyncUpdates(object):
+    def __init__(self, console):
+        """Awaitable equivalent of :class:`Updates <Updates>`
+
+        :param console: The AsyncConsole from which API calls are made
+        """
+        self.console = console
+        self._updates = Updates(console.console)
+
+    async def list_updates(self):
+        """List of available updates. See :meth:`Updates.list_updates`"""
+        return await self.console.get('updates/list', {}, self._updates.parse)
+
+    async def update_device(self, node_id, update_tag):
+        """Update the device. See :meth:`Updates.update_device`"""
+        params = {'node_id': node_id, 'update_tag': update_tag}
+        return await self.console.post('device/update', params)
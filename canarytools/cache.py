@@ -0,0 +1,244 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+# endpoints that are never cached unless configured otherwise
+DEFAULT_TTLS = {
+    'ping': 0,
+}
+
+# families whose cached responses are invalidated by a mutating call to a family
+RELATED_FAMILIES = {
+    'incident': ('incident', 'device'),
+    'device': ('device', 'flock', 'bundle', 'update'),
+    'flock': ('flock', 'device', 'canarytoken'),
+    'canarytoken': ('canarytoken',),
+    'setting': ('setting',),
+}
+
+
+def endpoint_family(url):
+    """The resource family of an endpoint, e.g. 'canarytoken' for both
+        'canarytokens/fetch' and 'canarytoken/enable'
+
+    :param url: Url of the API endpoint
+    :return: Name of the family
+    """
+    family = url.split('/')[0]
+    if family.endswith('s'):
+        family = family[:-1]
+    return family
+
+
+class ResponseCache(object):
+    def __init__(self, ttl=60, ttls=None, maxsize=256):
+        """Cache of decoded GET responses with per-endpoint expiry and LRU eviction.
+            Mutating calls made through the Console invalidate the cached responses
+            of related endpoints.
+
+        :param ttl: Default number of seconds a response is kept
+        :param ttls: Per endpoint expiry in seconds, keyed by endpoint (e.g. ``'flocks/list'``)
+            or family (e.g. ``'flock'``). ``0`` disables caching of an endpoint
+        :param maxsize: Maximum number of responses kept
+
+        **Attributes:**
+            - **hits (int)** -- Number of lookups answered from the cache
+            - **misses (int)** -- Number of lookups that had to go to the console
+            - **evictions (int)** -- Number of responses dropped to stay under ``maxsize``
+
+        Usage::
+
+            >>> import canarytools
+            >>> cache = canarytools.ResponseCache(ttl=30, ttls={'flocks/list': 600})
+            >>> console = canarytools.Console(cache=cache)
+        """
+        self.ttl = ttl
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock can't be pickled, a new one is made on unpickling
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, url, params):
+        """Look up a cached response
+
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        :return: The decoded response or ``None``
+        """
+        key = self._key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, url, params, response):
+        """Store a response
+
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        :param response: The decoded response
+        """
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return
+        key = self._key(url, params)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def ttl_for(self, url):
+        """Expiry in seconds used for an endpoint
+
+        :param url: Url of the API endpoint
+        """
+        if url in self.ttls:
+            return self.ttls[url]
+        return self.ttls.get(endpoint_family(url), self.ttl)
+
+    def invalidate(self, url):
+        """Drop the cached responses a mutating call to ``url`` may have made stale
+
+        :param url: Url of the mutating API endpoint
+        """
+        family = endpoint_family(url)
+        families = RELATED_FAMILIES.get(family, (family,))
+        with self._lock:
+            for key in [key for key in self._entries if endpoint_family(key[0]) in families]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Cache counters
+
+        :return: Dictionary with hits, misses, evictions and size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries)}
+
+    def _key(self, url, params):
+        return request_key(url, params)
+
+
+class ValidatorCache(object):
+    def __init__(self, maxsize=256):
+        """Validators (``ETag``/``Last-Modified``) of GET responses along with the
+            decoded and parsed response, used to revalidate polled endpoints with
+            conditional requests. A ``304 Not Modified`` reuses the stored objects,
+            skipping both the transfer and the parsing.
+
+        :param maxsize: Maximum number of responses kept
+
+        **Attributes:**
+            - **revalidated (int)** -- Number of requests answered with ``304 Not Modified``
+        """
+        self.maxsize = maxsize
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def headers(self, url, params):
+        """Conditional request headers for a request
+
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        :return: Dictionary of headers, empty if nothing is stored
+        """
+        with self._lock:
+            entry = self._entries.get(request_key(url, params))
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified(self, url, params, parser):
+        """Get the stored result for a request answered with ``304 Not Modified``
+
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        :param parser: The parser of the request
+        :return: Tuple of the decoded response and the parsed result, or ``None`` if
+            nothing is stored. The parsed result is ``None`` if it was parsed by a different parser
+        """
+        key = request_key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+        if entry['parser'] == parser:
+            return entry['response'], entry['result']
+        return entry['response'], None
+
+    def store(self, url, params, headers, response, parser, result):
+        """Store a response if it carries validators
+
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        :param headers: Response headers
+        :param response: The decoded response
+        :param parser: The parser of the request
+        :param result: The parsed result
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        key = request_key(url, params)
+        with self._lock:
+            self._entries[key] = {'etag': etag, 'last_modified': last_modified, 'response': response,
+                                  'parser': parser, 'result': result}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all stored responses"""
+        with self._lock:
+            self._entries.clear()
+
+
+def request_key(url, params):
+    """Hashable key identifying a request by its url and parameters"""
+    return url, tuple(sorted((key, str(value)) for key, value in (params or {}).items() if value is not None))
@@ -5,6 +5,7 @@ import logging
 import sys
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
@@ -14,13 +15,23 @@ except ImportError:
     # python 3
     import configparser
 
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    # ijson is an optional dependency used for streaming responses, install with: pip install canarytools[stream]
+    ijson = None
+
+from .models.base import REFRESH_LAZY, REFRESH_POLICIES
 from .models.devices import Devices
-from .models.incidents import Incidents
+from .models.incidents import Incidents, IncidentIndex
 from .models.settings import Settings
 from .models.canarytokens import CanaryTokens
 from .models.flocks import Flocks
-from .models.result import Result
+from .models.result import Result, BatchResult
 from .models.update import Updates
+from .cache import ResponseCache, ValidatorCache
+from .transport import Transport
 
 from .exceptions import ConfigurationError, ConsoleError, InvalidAuthTokenError, \
     ConnectionError, DeviceNotFoundError, IncidentNotFoundError, InvalidParameterError, \
@@ -37,7 +48,10 @@ logger.addHandler(logging.StreamHandler(sys.stderr))
 
 
 class Console(object):
-    def __init__(self, domain=None, api_key=None, timezone=pytz.utc, debug=False, debug_level=logging.DEBUG):
+    def __init__(self, domain=None, api_key=None, timezone=pytz.utc, debug=False, debug_level=logging.DEBUG,
+                 max_workers=8, raw_events=False, compact=False, cache=None, conditional=False, retry=None,
+                 transport=None, rate_limit=None, session=None, pool_connections=10, pool_maxsize=None,
+                 timeout=(10, 60), compress=True, base_url=None, refresh=REFRESH_LAZY):
         """Initialize Console object. All API calls are made with this object
 
         :param domain: The domain of the Canary console
@@ -48,6 +62,38 @@ class Console(object):
         :param debug_level: Debug level. ``logging`` debug level used. ``logging.DEBUG`` will display all
             requests and responses as well as response data. ``logging.INFO`` will only log the requests and responses.
             The default is ``logging.DEBUG``
+        :param max_workers: Default number of concurrent requests made by :meth:`map` and :meth:`batch`
+        :param raw_events: Leave incident events as raw JSON dicts instead of building
+            :class:`Event <Event>` objects
+        :param compact: Build models from a variant of their class with ``__slots__`` for their declared
+            fields, which leaves the instance ``__dict__`` unallocated, and intern the values of repetitive
+            fields such as kinds and flock ids, to reduce the memory held by long-lived objects
+        :param cache: Cache GET responses. ``True`` for a :class:`ResponseCache <ResponseCache>` with
+            default settings, or a configured ResponseCache
+        :param conditional: Revalidate GET requests with ``If-None-Match``/``If-Modified-Since``.
+            When the console answers ``304 Not Modified`` the previously returned objects are
+            returned again. ``True`` or a configured :class:`ValidatorCache <ValidatorCache>`
+        :param retry: The :class:`RetryPolicy <RetryPolicy>` for failed requests. By default GETs are
+            retried up to 3 times on connection errors, 429 and 5xx responses
+        :param transport: A :class:`Transport <Transport>` to send requests with, in place of the default
+        :param rate_limit: A :class:`RateLimiter <RateLimiter>` throttling requests made through this Console.
+            Every attempt counts, retries included. The same limiter may be shared between Console objects
+        :param session: A pre-configured ``requests.Session`` to send requests with. The connection
+            pool options are not applied to it and the session is not modified, so it may be shared
+            between Console objects
+        :param pool_connections: Number of connection pools to cache, one per host
+        :param pool_maxsize: Maximum number of connections kept alive per host. Defaults to
+            ``max_workers``, and at least 10, so concurrent callers reuse connections
+        :param timeout: Request timeout in seconds, either a number or a ``(connect, read)`` tuple.
+            ``None`` waits forever
+        :param compress: Accept gzip/deflate compressed responses. ``False`` asks the console for
+            uncompressed responses
+        :param base_url: Url of the console's API, e.g. ``'https://example.canary.tools/api/v1/'``.
+            Defaults to the API url of ``domain``
+        :param refresh: What objects do after a call that changes them, e.g. ``device.reboot()`` or
+            ``incident.acknowledge()``. ``'eager'`` fetches the object again straight away. ``'lazy'``
+            updates the fields whose new value is known, and fetches the object again on first access
+            to any other changed field. ``'none'`` only updates the known fields
 
         :except ConfigurationError: Domain and/or API auth token not set
 
@@ -79,13 +125,35 @@ class Console(object):
         self.domain = domain
         self.api_key = api_key
 
-        global ROOT
-        ROOT = ROOT.format(self.domain)
+        self.base_url = base_url or ROOT.format(self.domain)
 
         self.tz = timezone
 
-        self.session = requests.session()
-        self.session.params = {'auth_token': api_key}
+        if refresh not in REFRESH_POLICIES:
+            raise ConfigurationError("Unknown refresh policy '{0}'. Use one of: {1}".format(
+                refresh, ', '.join(REFRESH_POLICIES)))
+        self.refresh_policy = refresh
+
+        self.max_workers = max_workers
+        self.raw_events = raw_events
+        self.compact = compact
+        self.cache = ResponseCache() if cache is True else cache or None
+        self.validators = ValidatorCache() if conditional is True else conditional or None
+
+        self.timeout = timeout
+
+        if transport is None:
+            if session is None:
+                session = requests.session()
+                if pool_maxsize is None:
+                    # size the connection pool so concurrent calls from map() and batch() reuse connections
+                    pool_maxsize = max(max_workers, 10)
+                adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+                session.mount('https://', adapter)
+            transport = Transport(session, retry)
+        self.transport = transport
+        self.compress = compress
+        self.rate_limit = rate_limit
 
         self.devices = Devices(self)
         self.incidents = Incidents(self)
@@ -94,6 +162,8 @@ class Console(object):
         self.flocks = Flocks(self)
         self.updates = Updates(self)
 
+        self.incident_index = IncidentIndex(self)
+
     def ping(self):
         """Tests the connection to the Canary Console
 
@@ -125,43 +195,89 @@ class Console(object):
         :param files: Files to be uploaded
         :return: Object(s) or a Result Indicator Object
         """
-        try:
-            self.log('[{datetime}] POST to {ROOT}{url}.json: {params}'.format(
-                datetime=datetime.now(self.tz), ROOT=ROOT, url=url, params=params))
-            start = time.time()
-            r = self.session.post(url="{0}{1}".format(ROOT, url), data=params, files=files)
-            complete = time.time() - start
-            self.log(
-                '[{datetime}] Received {response_code} in {:.2f}ms: '.format(
-                    complete * 1000, datetime=datetime.now(self.tz), response_code=r.status_code), data=r.text)
-        except requests.exceptions.ConnectionError:
-            self.throw_connection_error()
-        return self.handle_response(r.json(), parser)
+        r = self.request('POST', url, params, files=files)
+        if self.cache is not None:
+            self.cache.invalidate(url)
+        return self.handle_response(self.decode(r), parser)
 
-    def get(self, url, params, parser=None, raw_resp=False):
+    def get(self, url, params, parser=None, raw_resp=False, stream=False, headers=None):
         """Get request
 
         :param url: Url of the API endpoint
         :param params: List of parameters to be sent
         :param parser: The function used to parse JSON data into an specific object
         :param raw_resp: If False, handle the response before returning, otherwise return raw response (e.g. for download)
+        :param stream: With ``raw_resp``, don't read the response body up front
+        :param headers: With ``raw_resp``, extra request headers, e.g. ``Range``
         :return: Object(s) or a Result Indicator Object
         """
-        try:
-            self.log('[{datetime}] GET to {ROOT}{url}.json: {params}'.format(
-                datetime=datetime.now(self.tz), ROOT=ROOT, url=url, params=params))
-            start = time.time()
-            resp = self.session.get(url="{0}{1}".format(ROOT, url), params=params)
-            complete = time.time() - start
-            self.log(
-                '[{datetime}] Received {response_code} in {:.2f}ms: '.format(
-                    complete * 1000, datetime=datetime.now(self.tz), response_code=resp.status_code), data=resp.text)
-        except requests.exceptions.ConnectionError:
-            self.throw_connection_error()
         if raw_resp:
-            resp.raise_for_status()
+            resp = self.request('GET', url, params, headers=headers, stream=stream)
+            try:
+                resp.raise_for_status()
+            except requests.exceptions.HTTPError:
+                resp.close()
+                raise
             return resp
-        return self.handle_response(resp.json(), parser)
+        if self.cache is not None:
+            response = self.cache.get(url, params)
+            if response is not None:
+                return self.handle_response(response, parser)
+        conditional = self.validators is not None
+        headers = self.validators.headers(url, params) if conditional else {}
+        resp = self.request('GET', url, params, headers=headers)
+        if conditional and resp.status_code == 304:
+            stored = self.validators.not_modified(url, params, parser)
+            if stored is not None:
+                response, result = stored
+                return result if result is not None else self.handle_response(response, parser)
+            resp = self.request('GET', url, params)
+        response = self.decode(resp)
+        if response.get('result') == RESULT_ERROR:
+            return self.handle_response(response, parser)
+        if self.cache is not None:
+            self.cache.set(url, params, response)
+        result = self.handle_response(response, parser)
+        if conditional:
+            self.validators.store(url, params, resp.headers, response, parser, result)
+        return result
+
+    def stream(self, url, params, key, parser):
+        """Get request that decodes the response incrementally. Elements of the
+            ``key`` array are parsed and yielded one at a time as they are read
+            from the socket, so the whole body is never held in memory.
+
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param key: Name of the top level array in the response, e.g. ``'incidents'``
+        :param parser: The function used to parse a single array element into an object
+        :return: Generator of objects
+
+        :except ConfigurationError: ijson is not installed
+        """
+        if ijson is None:
+            raise ConfigurationError("Streaming responses requires ijson. Install it with: pip install canarytools[stream]")
+        resp = self.request('GET', url, params, stream=True)
+
+        with resp:
+            resp.raw.decode_content = True
+            response = {}
+            item_prefix = key + '.item'
+            events = ijson.parse(resp.raw, use_float=True)
+            for prefix, event, value in events:
+                if prefix == item_prefix and event in ['start_map', 'start_array']:
+                    # build one array element and hand it straight to the parser
+                    builder = ObjectBuilder()
+                    end_event = event.replace('start', 'end')
+                    while (prefix, event) != (item_prefix, end_event):
+                        builder.event(event, value)
+                        prefix, event, value = next(events)
+                    yield parser(builder.value)
+                elif '.' not in prefix and event in ['string', 'number', 'boolean', 'null']:
+                    # keep top level fields such as 'result' and 'message'
+                    response[prefix] = value
+        if response.get('result') == RESULT_ERROR:
+            self.handle_exception(response)
 
     def delete(self, url, params, parser=None):
         """Delete request
@@ -171,18 +287,130 @@ class Console(object):
         :param parser: The function used to parse JSON data into an specific object
         :return: Object(s) or a Result Indicator Object
         """
+        r = self.request('DELETE', url, params)
+        if self.cache is not None:
+            self.cache.invalidate(url)
+        return self.handle_response(self.decode(r), parser)
+
+    def request(self, method, url, params, files=None, headers=None, stream=False):
+        """Send a request through the Console's transport. All API calls go through here
+
+        :param method: HTTP method
+        :param url: Url of the API endpoint
+        :param params: List of parameters to be sent
+        :param files: Files to be uploaded with a POST
+        :param headers: Extra request headers
+        :param stream: Don't read the response body up front
+        :return: The raw response
+        :rtype: requests.Response
+
+        :except ConnectionError: The console could not be reached
+        """
+        if not self.compress:
+            headers = dict(headers or {})
+            headers.setdefault('Accept-Encoding', 'identity')
+        kwargs = {'headers': headers, 'stream': stream, 'timeout': self.timeout}
+        # the key goes with each request rather than on the session, which may be shared between consoles
+        auth = {'auth_token': self.api_key}
+        if method == 'POST':
+            kwargs['params'] = auth
+            kwargs['data'] = params
+            kwargs['files'] = files
+        else:
+            kwargs['params'] = dict(params or {}, **auth)
         try:
-            self.log('[{datetime}] DELETE to {ROOT}{url}.json: {params}'.format(
-                datetime=datetime.now(self.tz), ROOT=ROOT, url=url, params=params))
+            self.log_request(method, url, params)
             start = time.time()
-            r = self.session.delete(url="{0}{1}".format(ROOT, url), params=params)
+            resp = self.transport.request(method, "{0}{1}".format(self.base_url, url), url,
+                                          rate_limit=self.rate_limit, **kwargs)
             complete = time.time() - start
-            self.log(
-                '[{datetime}] Received {response_code} in {:.2f}ms: '.format(
-                    complete * 1000, datetime=datetime.now(self.tz), response_code=r.status_code), data=r.text)
-        except requests.exceptions.ConnectionError:
+            self.log_response(resp.status_code, complete, (lambda: '<streamed>') if stream else (lambda: resp.text))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             self.throw_connection_error()
-        return self.handle_response(r.json(), parser)
+        return resp
+
+    def decode(self, resp):
+        """Decode the JSON body of a response
+
+        :param resp: The raw response
+        :return: The decoded JSON data
+
+        :except ConsoleError: The console didn't return JSON, e.g. after running out of retries on a 503
+        """
+        try:
+            return resp.json()
+        except ValueError:
+            raise ConsoleError("Unexpected response from console at domain '{domain}': HTTP {status}".format(
+                domain=self.domain, status=resp.status_code))
+
+    def map(self, func, items, max_workers=None):
+        """Call a function on each item concurrently. Calls share the console's
+            connection pool. An exception raised for one item is collected
+            and does not stop the others.
+
+        :param func: Function taking a single item, e.g. ``lambda token: token.enable()``
+        :param items: Iterable of items
+        :param max_workers: Maximum number of concurrent calls. Defaults to the
+            ``max_workers`` the Console was created with
+        :return: List of results in input order
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> results = console.map(lambda token: token.disable(), console.tokens.all())
+            >>> failed = [r.item for r in results if not r.ok]
+        """
+        items = list(items)
+        if not items:
+            return list()
+
+        def call(item):
+            try:
+                return BatchResult(item, result=func(item))
+            except Exception as e:
+                return BatchResult(item, error=e)
+
+        workers = min(max_workers or self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(call, items))
+
+    def batch(self, calls, max_workers=None):
+        """Send several API requests concurrently
+
+        :param calls: Iterable of ``(method, url, params)`` or ``(method, url, params, parser)``
+            tuples, where method is one of ``'get'``, ``'post'`` or ``'delete'``
+        :param max_workers: Maximum number of concurrent requests
+        :return: List of results in input order
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        :except InvalidParameterError: Unsupported request method
+
+        Usage::
+
+            >>> import canarytools
+            >>> results = console.batch([('post', 'canarytoken/enable', {'canarytoken': key}) for key in keys])
+        """
+        calls = list(calls)
+        for call in calls:
+            if call[0].lower() not in ['get', 'post', 'delete']:
+                raise InvalidParameterError("Unsupported request method: {0}".format(call[0]))
+
+        def send(call):
+            method, url, params = call[:3]
+            parser = call[3] if len(call) > 3 else None
+            return getattr(self, method.lower())(url, params, parser)
+
+        return self.map(send, calls, max_workers=max_workers)
+
+    @property
+    def session(self):
+        """The ``requests.Session`` requests are sent with"""
+        return self.transport.session
+
+    @session.setter
+    def session(self, session):
+        self.transport.session = session
 
     def throw_connection_error(self):
         raise ConnectionError(
@@ -240,16 +468,33 @@ class Console(object):
             raise ConsoleError(message)
         raise ConsoleError()
 
-    def log(self, msg, data=None):
-        """Log debug information based on level
+    def log_request(self, method, url, params):
+        """Log an outgoing request. Does nothing unless debugging is enabled
+
+        :param method: HTTP method
+        :param url: Url of the API endpoint
+        :param params: Parameters of the request
+        """
+        if self.level not in (logging.INFO, logging.DEBUG):
+            return
+        logger.log(self.level, '[%s] %s to %s%s.json: %s', datetime.now(self.tz), method, self.base_url, url,
+                   params, extra={'canarytools': {'method': method, 'url': url, 'params': params}})
+
+    def log_response(self, status_code, elapsed, body):
+        """Log a received response. Does nothing unless debugging is enabled, and
+            only reads the response body when logging at ``logging.DEBUG``
+
+        :param status_code: HTTP status code of the response
+        :param elapsed: Time taken by the request in seconds
+        :param body: Function returning the response body
         """
         if self.level == logging.INFO:
-            log_msg = '{log_msg} Please set logging level to INFO, or greater, to see response data payload.'.format(
-                log_msg=msg)
-            logger.info(log_msg)
+            logger.info('[%s] Received %s in %.2fms: Please set logging level to DEBUG to see response data payload.',
+                        datetime.now(self.tz), status_code, elapsed * 1000,
+                        extra={'canarytools': {'status_code': status_code, 'elapsed': elapsed}})
         elif self.level == logging.DEBUG:
-            log_msg = '{log_msg} {data}'.format(log_msg=msg, data=data)
-            logger.debug(log_msg)
+            logger.debug('[%s] Received %s in %.2fms: %s', datetime.now(self.tz), status_code, elapsed * 1000, body(),
+                         extra={'canarytools': {'status_code': status_code, 'elapsed': elapsed}})
 
     def __repr__(self):
         return '<Console %s>' % self.api_key
@@ -0,0 +1,254 @@
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+from .models.canarytokens import CanaryToken
+from .models.flocks import Flock
+from .models.timestamps import format_newer_than, parse_timestamp
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS incidents (
+    id TEXT PRIMARY KEY,
+    node_id TEXT,
+    flock_id TEXT,
+    src_host TEXT,
+    logtype TEXT,
+    acknowledged INTEGER,
+    created REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS incidents_node_id ON incidents (node_id, created);
+CREATE INDEX IF NOT EXISTS incidents_flock_id ON incidents (flock_id, created);
+CREATE INDEX IF NOT EXISTS incidents_src_host ON incidents (src_host, created);
+CREATE INDEX IF NOT EXISTS incidents_logtype ON incidents (logtype, created);
+CREATE INDEX IF NOT EXISTS incidents_created ON incidents (created);
+
+CREATE TABLE IF NOT EXISTS devices (
+    node_id TEXT PRIMARY KEY,
+    flock_id TEXT,
+    live INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS devices_flock_id ON devices (flock_id);
+
+CREATE TABLE IF NOT EXISTS tokens (
+    canarytoken TEXT PRIMARY KEY,
+    node_id TEXT,
+    flock_id TEXT,
+    kind TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tokens_node_id ON tokens (node_id);
+CREATE INDEX IF NOT EXISTS tokens_flock_id ON tokens (flock_id);
+CREATE INDEX IF NOT EXISTS tokens_kind ON tokens (kind);
+
+CREATE TABLE IF NOT EXISTS flocks (
+    flock_id TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS mirror_state (
+    name TEXT PRIMARY KEY,
+    value REAL
+);
+'''
+
+
+def _raw(data):
+    return data
+
+
+def _epoch(value):
+    """Seconds since the epoch of a datetime, naive datetimes being UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class LocalMirror(object):
+    def __init__(self, console, path=':memory:'):
+        """A local SQLite copy of a console's incidents, devices, Canarytokens and flocks for
+            ad-hoc queries. :meth:`sync` fetches everything from the console; the query methods
+            then run against indexed tables without going back to the console.
+
+            The raw JSON of every object is stored and parsed into the usual model classes
+            on query. Devices are returned like those of a listing, so attributes missing
+            from the listing, e.g. ``unacknowleged_incidents``, are fetched from the console
+            when accessed.
+
+        :param console: The Console from which API calls are made
+        :param path: Path of the SQLite database. The mirror is kept in memory by default
+
+        Usage::
+
+            >>> import canarytools
+            >>> mirror = canarytools.LocalMirror(console, 'mirror.db')
+            >>> mirror.sync()
+            >>> incidents = mirror.incidents(src_host='10.0.0.5', flock_id='flock:default',
+            ...                              since=datetime.datetime.utcnow() - datetime.timedelta(days=7))
+        """
+        self.console = console
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(SCHEMA)
+
+    def sync(self):
+        """Replace the contents of the mirror with a fresh copy of the console's
+            incidents, devices, Canarytokens and flocks
+        """
+        self.sync_incidents()
+        self.sync_devices()
+        self.sync_tokens()
+        self.sync_flocks()
+
+    def sync_incidents(self, newer_than=None):
+        """Fetch the console's incidents into the mirror
+
+        :param newer_than: Only fetch incidents newer than this datetime, adding them to the
+            mirror. By default all incidents are fetched and replace the mirrored ones
+        """
+        params = {'tz': self.console.tz}
+        if newer_than is not None:
+            params['newer_than'] = format_newer_than(newer_than)
+        data = self.console.get('incidents/all', params, _raw)
+        rows = list()
+        for incident in data.get('incidents', []) if data else []:
+            fields = dict(incident)
+            if isinstance(incident.get('description'), dict):
+                fields.update(incident['description'])
+            try:
+                created = _epoch(parse_timestamp(fields.get('created_std')))
+            except (ValueError, OverflowError):
+                created = None
+            logtype = fields.get('logtype')
+            rows.append((incident['id'], fields.get('node_id'), fields.get('flock_id'), fields.get('src_host'),
+                         str(logtype) if logtype is not None else None, fields.get('acknowledged') in ('True', True),
+                         created, json.dumps(incident)))
+        self._replace('incidents', rows, clear=newer_than is None)
+
+    def sync_devices(self):
+        """Fetch the console's devices into the mirror"""
+        data = self.console.get('devices/all', {'tz': self.console.tz}, _raw)
+        rows = [(device.get('id'), device.get('flock_id'), device.get('device_live') in ('True', True),
+                 json.dumps(device))
+                for device in (data.get('devices', []) if data else [])]
+        self._replace('devices', rows)
+
+    def sync_tokens(self):
+        """Fetch the console's Canarytokens into the mirror"""
+        data = self.console.get('canarytokens/fetch', {'include_endpoints': 'True'}, _raw)
+        rows = [(token.get('canarytoken'), token.get('node_id'), token.get('flock_id'), token.get('kind'),
+                 json.dumps(token))
+                for token in (data.get('tokens', []) if data else [])]
+        self._replace('tokens', rows)
+
+    def sync_flocks(self):
+        """Fetch the console's flocks into the mirror"""
+        data = self.console.get('flocks/list', {}, _raw)
+        rows = [(flock_id, name, json.dumps({'flock_id': flock_id, 'name': name}))
+                for flock_id, name in (data.get('flocks', {}) if data else {}).items()]
+        self._replace('flocks', rows)
+
+    def synced(self, table):
+        """Time a table was last synced
+
+        :param table: One of 'incidents', 'devices', 'tokens' or 'flocks'
+        :return: Seconds since the epoch, or ``None`` if it was never synced
+        """
+        row = self._db.execute('SELECT value FROM mirror_state WHERE name = ?', (table,)).fetchone()
+        return row[0] if row else None
+
+    def incidents(self, src_host=None, node_id=None, flock_id=None, logtype=None, acknowledged=None,
+                  since=None, until=None, limit=None):
+        """Query the mirrored incidents. All given filters must match.
+
+        :param src_host: Source IP address of the incident
+        :param node_id: Node id of the device
+        :param flock_id: Id of the flock
+        :param logtype: Log type of the incident
+        :param acknowledged: ``True`` or ``False`` to filter on the acknowledged state
+        :param since: Only incidents created at or after this datetime, UTC if naive
+        :param until: Only incidents created before this datetime, UTC if naive
+        :param limit: Maximum number of incidents returned
+        :return: Matching incidents, oldest first
+        :rtype: List of :class:`Incident <Incident>` objects
+        """
+        clauses = [('src_host = ?', src_host), ('node_id = ?', node_id), ('flock_id = ?', flock_id),
+                   ('logtype = ?', str(logtype) if logtype is not None else None),
+                   ('acknowledged = ?', acknowledged), ('created >= ?', _epoch(since)),
+                   ('created < ?', _epoch(until))]
+        rows = self._select('incidents', clauses, 'created', limit)
+        return [self.console.incidents.parse_incident(json.loads(row)) for row in rows]
+
+    def devices(self, flock_id=None, node_id=None, live=None):
+        """Query the mirrored devices
+
+        :param flock_id: Id of the flock
+        :param node_id: Node id of the device
+        :param live: ``True`` or ``False`` to filter on the connected state
+        :return: Matching devices
+        :rtype: List of :class:`Device <Device>` objects
+        """
+        clauses = [('flock_id = ?', flock_id), ('node_id = ?', node_id), ('live = ?', live)]
+        rows = self._select('devices', clauses, 'node_id')
+        devices = list()
+        for row in rows:
+            data = json.loads(row)
+            # resolved against the console's incidents on access rather than while querying
+            data.pop('unacknowleged_incidents', None)
+            devices.append(self.console.devices._parse_listed(data))
+        return devices
+
+    def tokens(self, kind=None, flock_id=None, node_id=None):
+        """Query the mirrored Canarytokens
+
+        :param kind: Kind of Canarytoken, e.g. ``CanaryTokenKinds.DOC_MSWORD``
+        :param flock_id: Id of the flock
+        :param node_id: Node id of the token
+        :return: Matching Canarytokens
+        :rtype: List of :class:`CanaryToken <CanaryToken>` objects
+        """
+        clauses = [('kind = ?', kind), ('flock_id = ?', flock_id), ('node_id = ?', node_id)]
+        rows = self._select('tokens', clauses, 'canarytoken')
+        return [CanaryToken.parse(self.console, json.loads(row)) for row in rows]
+
+    def flocks(self, name=None):
+        """Query the mirrored flocks
+
+        :param name: Name of the flock
+        :return: Matching flocks
+        :rtype: List of :class:`Flock <Flock>` objects
+        """
+        rows = self._select('flocks', [('name = ?', name)], 'flock_id')
+        return [Flock.parse(self.console, json.loads(row)) for row in rows]
+
+    def close(self):
+        """Close the database"""
+        self._db.close()
+
+    def _replace(self, table, rows, clear=True):
+        placeholders = ', '.join('?' * len(rows[0])) if rows else ''
+        with self._lock, self._db:
+            if clear:
+                self._db.execute('DELETE FROM {0}'.format(table))
+            if rows:
+                self._db.executemany('INSERT OR REPLACE INTO {0} VALUES ({1})'.format(table, placeholders), rows)
+            self._db.execute('INSERT OR REPLACE INTO mirror_state (name, value) VALUES (?, ?)', (table, time.time()))
+
+    def _select(self, table, clauses, order, limit=None):
+        clauses = [(clause, value) for clause, value in clauses if value is not None]
+        query = 'SELECT data FROM {0}'.format(table)
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clause for clause, _ in clauses)
+        query += ' ORDER BY {0}'.format(order)
+        if limit is not None:
+            query += ' LIMIT {0:d}'.format(limit)
+        with self._lock:
+            return [row[0] for row in self._db.execute(query, [value for _, value in clauses])]
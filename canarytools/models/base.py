@@ -1,4 +1,27 @@
+try:
+    from sys import intern
+except ImportError:
+    # python 2
+    pass
+
+# what a model does after a call that changes it on the console, see CanaryToolsBase._mutated()
+REFRESH_EAGER = 'eager'
+REFRESH_LAZY = 'lazy'
+REFRESH_NONE = 'none'
+REFRESH_POLICIES = (REFRESH_EAGER, REFRESH_LAZY, REFRESH_NONE)
+
+
 class CanaryToolsBase(object):
+    # fields every object of the class is expected to carry. Used to lay out
+    # the slots of the compact variant of the class, see compact_class()
+    _fields = frozenset(['console'])
+
+    # bookkeeping attributes, kept in slots of the compact variant
+    _private = ('_hydrated', '_stale')
+
+    # low-cardinality fields whose values the compact variant interns, as they repeat across objects
+    _interned = frozenset(['kind', 'flock_id', 'node_id', 'summary', 'logtype'])
+
     @classmethod
     def parse(cls, console, data):
         """Initialize model
@@ -7,8 +30,34 @@ class CanaryToolsBase(object):
         :param console: Console object from which API calls are made
         :return: Initializes sub-class
         """
+        if getattr(console, 'compact', False):
+            cls = cls.compact_class()
         return cls(console, data)
 
+    @classmethod
+    def compact_class(cls):
+        """Get the compact variant of this class. Fields declared in ``_fields`` are stored
+            in ``__slots__``, anything else falls back to the instance ``__dict__``, which
+            is only allocated when such a field turns up.
+
+        :return: Subclass of this class
+        """
+        compact = cls.__dict__.get('_compact')
+        if compact is None:
+            # don't shadow methods, e.g. Device.settings
+            slots = tuple(sorted(field for field in cls._fields if not hasattr(cls, field)))
+            compact = type(cls.__name__, (cls, _CompactFields), {
+                '__slots__': slots + cls._private,
+                '__module__': cls.__module__,
+                '__doc__': cls.__doc__,
+                '_slots': slots,
+                '_declared': cls,
+                '_compact': None,
+            })
+            compact._compact = compact
+            cls._compact = compact
+        return compact
+
     def __init__(self, console, data):
         """Initialize CanaryToolsBase and set all JSON key-value pairs as the
             objects attributes
@@ -24,3 +73,124 @@ class CanaryToolsBase(object):
                     setattr(self, attribute, value)
             elif type(data) is list:
                 setattr(self, "details", data)
+
+    def _flag(self, name, default=None):
+        """Value of a bookkeeping attribute, e.g. ``_hydrated``, without going through __getattr__
+
+        :param name: Name of the attribute
+        :param default: Value returned if the attribute isn't set
+        """
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return default
+
+    def _set(self, key, value):
+        """Set an already processed attribute, bypassing the model's __setattr__"""
+        super(CanaryToolsBase, self).__setattr__(key, value)
+
+    def _unset(self, key):
+        """Remove an attribute if it is set, bypassing the model's __delattr__"""
+        try:
+            super(CanaryToolsBase, self).__delattr__(key)
+        except AttributeError:
+            pass
+
+    def _attributes(self):
+        """All attributes set on the object, including those held in slots. A stale
+            object is fetched again first, so fields dropped by a change aren't missing
+
+        :return: Dictionary of attribute names and values
+        """
+        if self._flag('_stale', False):
+            self.refresh()
+        attributes = {}
+        for slot in getattr(self, '_slots', ()):
+            try:
+                attributes[slot] = object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+        attributes.update((key, value) for key, value in self._flag('__dict__', {}).items()
+                          if not key.startswith('_'))
+        return attributes
+
+    def _update(self, other):
+        """Copy all already processed attributes of another object onto this one
+
+        :param other: Object of the same model
+        """
+        for key, value in other._attributes().items():
+            self._set(key, value)
+        # the object now matches the console again
+        self._unset('_stale')
+
+    @property
+    def stale(self):
+        """``True`` if the object was changed on the console and hasn't been fetched again
+            since. Fields whose new value isn't known are fetched on first access.
+        """
+        return self._flag('_stale', False)
+
+    def __getattr__(self, key):
+        """Fetch the object again on first access to a field dropped by a change"""
+        if key.startswith('_') or key == 'console' or not self._flag('_stale', False):
+            raise AttributeError("'{cls}' object has no attribute '{key}'".format(
+                cls=self.__class__.__name__, key=key))
+        self.refresh()
+        return getattr(self, key)
+
+    def _mutated(self, known, unknown):
+        """Bring the object up to date after a call that changed it on the console,
+            following the Console's refresh policy:
+
+            - ``'eager'``: fetch the object again straight away
+            - ``'lazy'``: apply the known changes, drop the fields whose new value isn't known
+              and mark the object stale. It is fetched again on first access to a dropped field
+            - ``'none'``: only apply the known changes
+
+        :param known: Dictionary of fields and their new values, as the console's JSON would hold them
+        :param unknown: Fields whose new value isn't known
+        """
+        policy = getattr(self.console, 'refresh_policy', REFRESH_EAGER)
+        if policy == REFRESH_EAGER:
+            self.refresh()
+            return
+        for key, value in known.items():
+            setattr(self, key, value)
+        if policy == REFRESH_LAZY:
+            for key in unknown:
+                self._unset(key)
+            self._set('_stale', True)
+
+
+class _CompactFields(object):
+    """Last base of every compact class. Interns the values of low-cardinality fields
+        and pickles objects as their declared class, which the compact class stands in for
+    """
+    __slots__ = ()
+
+    def __setattr__(self, key, value):
+        if key in self._interned and type(value) is str:
+            value = intern(value)
+        object.__setattr__(self, key, value)
+
+    def __reduce__(self):
+        state = dict(self._flag('__dict__', {}))
+        for slot in self._slots + self._private:
+            try:
+                state[slot] = object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+        return _compact_object, (self._declared, state)
+
+
+def _compact_object(cls, state):
+    """Rebuild a pickled compact object
+
+    :param cls: Declared model class
+    :param state: Dictionary of attribute names and values
+    """
+    model = object.__new__(cls.compact_class())
+    for key, value in state.items():
+        object.__setattr__(model, key, value)
+    return model
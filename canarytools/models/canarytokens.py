@@ -1,7 +1,20 @@
+import bisect
+import hashlib
+import json
 import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+import requests
 
 from .base import CanaryToolsBase
-from ..exceptions import InvalidParameterError
+from .result import BatchResult
+from ..exceptions import ConsoleError, InvalidParameterError, CanaryTokenError
+
+# seconds the console's clock may be behind ours when matching the tokens of interrupted creates
+CLOCK_SKEW = 5
 
 
 class CanaryTokens(object):
@@ -9,8 +22,29 @@ class CanaryTokens(object):
         """Initialize CanaryToken
 
         :param console: The Console object from which API calls are made
+
+        **Attributes:**
+            - **detail_hits (int)** -- Number of token details served from the detail cache
+            - **detail_misses (int)** -- Number of token details fetched from the console
+            - **detail_ttl (float)** -- Number of seconds a cached token detail is used for
         """
         self.console = console
+        self.detail_hits = 0
+        self.detail_misses = 0
+        self.detail_ttl = 300
+        # (token, expiry) of the full detail fetched for tokens of light listings, keyed by canarytoken
+        self._details = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock can't be pickled, a new one is made on unpickling
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
     def create(
         self, 
@@ -54,6 +88,175 @@ class CanaryTokens(object):
             >>> import canarytools
             >>> result = console.tokens.create(memo='Desktop Token', kind=canarytools.CanaryTokenKinds.DOC_MSWORD)
         """
+        params, files = self._create_request(
+            memo, kind, flock_id=flock_id, web_image=web_image, mimetype=mimetype, cloned_web=cloned_web,
+            browser_redirect_url=browser_redirect_url, s3_source_bucket=s3_source_bucket,
+            s3_log_bucket=s3_log_bucket, process_name=process_name, expected_referrer=expected_referrer)
+        return self.console.post('canarytoken/create', params, self.parse, files)
+
+    def create_many(self, specs, max_workers=None, manifest=None):
+        """Create many Canarytokens concurrently. Results are yielded as the tokens are
+            created, so a large rollout can be consumed as it goes. Image files of
+            ``web_image`` tokens are read once and shared by every spec using them.
+
+            With a ``manifest``, each create is recorded in a JSON lines file before it is
+            sent and once it has succeeded. Running again with the same specs and manifest
+            skips the tokens already created. A create that was in flight when the previous
+            run stopped is matched by memo and kind against the console's tokens created
+            since it was sent, rather than sent again, so no duplicates are created. A create
+            the console turned down is sent again.
+
+        :param specs: Iterable of dictionaries of :meth:`create` arguments, e.g.
+            ``{'memo': 'Payroll on host-42', 'kind': CanaryTokenKinds.DOC_MSWORD}``
+        :param max_workers: Maximum number of concurrent requests. Defaults to the Console's ``max_workers``
+        :param manifest: Path of the manifest file, created if it doesn't exist
+        :return: Generator of outcomes in completion order, the ``item`` of each being the spec and the
+            ``result`` the new :class:`CanaryToken <CanaryToken>`
+        :rtype: Generator of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> specs = ({'memo': 'Payroll on {0}'.format(host), 'kind': canarytools.CanaryTokenKinds.DOC_MSWORD}
+            ...          for host in hosts)
+            >>> for result in console.tokens.create_many(specs, manifest='rollout.jsonl'):
+            ...     if not result.ok:
+            ...         print(result)
+        """
+        workers = max_workers or self.console.max_workers
+        images = {}
+        lock = threading.Lock()
+        created, pending = self._read_manifest(manifest) if manifest else ({}, {})
+        log = open(manifest, 'a') if manifest else None
+        matched = None
+
+        def record(entry):
+            with lock:
+                log.write(json.dumps(entry) + '\n')
+                log.flush()
+                os.fsync(log.fileno())
+
+        def create(key, spec):
+            spec = dict(spec)
+            params, files = self._create_request(images=images, **spec)
+            if log is not None:
+                record({'key': key, 'state': 'pending', 'memo': spec.get('memo'), 'kind': spec.get('kind'),
+                        'sent': time.time()})
+            # a connection error or a response that isn't JSON leaves the pending entry in place, as
+            # it isn't known whether the token was created
+            resp = self.console.request('POST', 'canarytoken/create', params, files=files)
+            if self.console.cache is not None:
+                self.console.cache.invalidate('canarytoken/create')
+            response = self.console.decode(resp)
+            try:
+                data = self.console.handle_response(response, lambda data: data)
+            except ConsoleError:
+                # the console turned the create down, so the next run sends it again
+                if log is not None:
+                    record({'key': key, 'state': 'failed'})
+                raise
+            token = data.get('canarytoken') or data.get('token')
+            if log is not None:
+                record({'key': key, 'state': 'done', 'token': token})
+            return CanaryToken.parse(self.console, token)
+
+        def result(future, spec):
+            try:
+                return BatchResult(spec, result=future.result())
+            except Exception as e:
+                return BatchResult(spec, error=e)
+
+        seen = {}
+        in_flight = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for spec in specs:
+                    key = spec_key(spec, seen)
+                    if key in created:
+                        yield BatchResult(spec, result=CanaryToken.parse(self.console, created[key]))
+                        continue
+                    if key in pending:
+                        if matched is None:
+                            matched = self._match_pending(pending, created)
+                        if key in matched:
+                            record({'key': key, 'state': 'done', 'token': matched[key]})
+                            yield BatchResult(spec, result=CanaryToken.parse(self.console, matched[key]))
+                            continue
+
+                    in_flight[executor.submit(create, key, spec)] = spec
+                    # keep at most a couple of requests queued per worker
+                    if len(in_flight) >= workers * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield result(future, in_flight.pop(future))
+                for future in as_completed(list(in_flight)):
+                    yield result(future, in_flight.pop(future))
+        finally:
+            if log is not None:
+                log.close()
+
+    def _read_manifest(self, manifest):
+        """Load the tokens created and the creates that were sent by a previous run
+
+        :return: Tuple of dictionaries keyed by spec key, of token data and of pending entries
+        """
+        created, pending = {}, {}
+        if not os.path.exists(manifest):
+            return created, pending
+        with open(manifest) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash
+                    continue
+                if entry.get('state') == 'done':
+                    created[entry['key']] = entry['token']
+                    pending.pop(entry['key'], None)
+                elif entry.get('state') == 'failed':
+                    pending.pop(entry['key'], None)
+                elif entry.get('state') == 'pending' and entry['key'] not in created:
+                    pending[entry['key']] = entry
+        return created, pending
+
+    def _match_pending(self, pending, created):
+        """Find the tokens created by requests that were in flight when a previous run stopped
+
+        :return: Dictionary of token data keyed by spec key
+        """
+        claimed = set(token.get('canarytoken') for token in created.values())
+        data = self.console.get('canarytokens/fetch', {'include_endpoints': 'False'}, lambda data: data)
+        candidates = {}
+        for token in data.get('tokens', []) if data else []:
+            if token.get('canarytoken') in claimed:
+                continue
+            try:
+                created_at = float(token.get('created'))
+            except (TypeError, ValueError):
+                continue
+            candidates.setdefault((token.get('memo'), token.get('kind')), []).append((created_at, token))
+        matched = {}
+        # match the earliest creates first, each to the earliest token created after it was sent
+        for key, entry in sorted(pending.items(), key=lambda item: item[1].get('sent') or 0):
+            if entry.get('sent') is None:
+                continue
+            tokens = candidates.get((entry.get('memo'), entry.get('kind')), [])
+            for candidate in sorted(tokens, key=lambda item: item[0]):
+                if candidate[0] >= entry['sent'] - CLOCK_SKEW:
+                    tokens.remove(candidate)
+                    matched[key] = candidate[1]
+                    break
+        return matched
+
+    def _create_request(self, memo, kind, flock_id=None, web_image=None, mimetype=None, cloned_web=None,
+                        browser_redirect_url=None, s3_source_bucket=None, s3_log_bucket=None, process_name=None,
+                        expected_referrer=None, images=None):
+        """Build the parameters and files for a canarytoken/create request
+
+        :param images: Optional dictionary of image file contents keyed by path, shared
+            between requests so each image is only read once
+        :return: Tuple of the request parameters and files to upload
+        """
         params = {'memo': memo, 'kind': kind}
         if flock_id:
             params['flock_id'] = flock_id
@@ -76,16 +279,21 @@ class CanaryTokens(object):
         if expected_referrer:
             params['expected_referrer'] = expected_referrer
 
-        # load image and send
+        # load image to send
+        files = {}
         if web_image:
-            with open(web_image, 'rb') as f:
-                if not mimetype:
-                    raise InvalidParameterError("Mimetype cannot be null")
+            if not mimetype:
+                raise InvalidParameterError("Mimetype cannot be null")
+            content = images.get(web_image) if images is not None else None
+            if content is None:
+                with open(web_image, 'rb') as f:
+                    content = f.read()
+                if images is not None:
+                    images[web_image] = content
 
-                files = {'web_image': (os.path.basename(web_image), f, mimetype)}
-                return self.console.post('canarytoken/create', params, self.parse, files)
+            files = {'web_image': (os.path.basename(web_image), content, mimetype)}
 
-        return self.console.post('canarytoken/create', params, self.parse)
+        return params, files
 
     def get_token(self, canarytoken):
         """Gets a single Canarytoken
@@ -104,9 +312,14 @@ class CanaryTokens(object):
         params = {'canarytoken': canarytoken}
         return self.console.get('canarytoken/fetch', params, self.parse)
 
-    def all(self, include_endpoints=True):
+    def all(self, include_endpoints=False, stream=False):
         """Fetch all Canarytokens
 
+        :param include_endpoints: Include the endpoint details of each Canarytoken. By default a light
+            listing is fetched and the full detail of a token is only fetched, with :meth:`get_token`,
+            when an attribute missing from the listing is accessed. See :meth:`hydrate`
+        :param stream: Decode the response incrementally and return a generator instead of a list.
+            Requires ijson
         :return: A list of Canarytoken objects
         :rtype: List of :class:`CanaryToken <CanaryToken>` objects
 
@@ -118,7 +331,99 @@ class CanaryTokens(object):
             >>> tokens = console.tokens.all()
         """
         params = {'include_endpoints':str(include_endpoints)}
-        return self.console.get('canarytokens/fetch', params, self.parse)
+        if include_endpoints:
+            parse_token = lambda token: CanaryToken.parse(self.console, token)
+        else:
+            parse_token = self._parse_listed
+        if stream:
+            return self.console.stream('canarytokens/fetch', params, 'tokens', parse_token)
+        return self.console.get('canarytokens/fetch', params,
+                                lambda data: [parse_token(token) for token in (data or {}).get('tokens', [])])
+
+    def hydrate(self, tokens, max_workers=None):
+        """Fetch the full detail of several tokens from a light listing concurrently
+
+        :param tokens: List of :class:`CanaryToken <CanaryToken>` objects
+        :param max_workers: Maximum number of concurrent requests. Defaults to the Console's ``max_workers``
+        :return: Outcome for each token that wasn't hydrated yet
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> tokens = console.tokens.all()
+            >>> console.tokens.hydrate([token for token in tokens if token.kind == 'aws-id'])
+        """
+        tokens = [token for token in tokens if not token._flag('_hydrated', True)]
+        return self.console.map(lambda token: token.hydrate(), tokens, max_workers=max_workers)
+
+    def get_detail(self, canarytoken, updated_id=None):
+        """Get the full detail of a token, from the detail cache if it was fetched less
+            than ``detail_ttl`` seconds ago and the token hasn't changed since
+
+        :param canarytoken: The key specifying a unique Canarytoken
+        :param updated_id: The token's current ``updated_id``, e.g. from a listing. A cached
+            detail with a different ``updated_id`` is fetched again
+        :return: A Canarytoken object
+        :rtype: :class:`CanaryToken <CanaryToken>` object
+
+        :except CanaryTokenError: Could not find the CanaryToken
+        """
+        with self._lock:
+            entry = self._details.get(canarytoken)
+            if entry is not None:
+                token, expires = entry
+                if expires > time.time() and (updated_id is None or
+                                              token._attributes().get('updated_id') == updated_id):
+                    self.detail_hits += 1
+                    return token
+                del self._details[canarytoken]
+            self.detail_misses += 1
+        token = self.get_token(canarytoken)
+        with self._lock:
+            self._details[canarytoken] = (token, time.time() + self.detail_ttl)
+        return token
+
+    def discard(self, canarytoken):
+        """Drop a token from the detail cache, e.g. after it was changed
+
+        :param canarytoken: The key specifying a unique Canarytoken
+        """
+        with self._lock:
+            self._details.pop(canarytoken, None)
+
+    def stats(self):
+        """Detail cache counters
+
+        :return: Dictionary with hits, misses and size
+        """
+        with self._lock:
+            return {'hits': self.detail_hits, 'misses': self.detail_misses, 'size': len(self._details)}
+
+    def _parse_listed(self, data):
+        """Build a CanaryToken from a light listing, full detail is fetched on demand"""
+        token = CanaryToken.parse(self.console, data)
+        token._hydrated = False
+        return token
+
+    def download_many(self, tokens, directory, max_workers=None, **kwargs):
+        """Download several Canarytokens concurrently. See :meth:`CanaryToken.download`
+
+        :param tokens: List of :class:`CanaryToken <CanaryToken>` objects
+        :param directory: Directory the files are written to, under the names given by the console
+        :param max_workers: Maximum number of concurrent downloads. Defaults to the Console's ``max_workers``
+        :param kwargs: Arguments passed on to :meth:`CanaryToken.download`, e.g. ``resume``
+        :return: Outcome for each token in the order given, the ``result`` of each being the filename written to
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> tokens = [token for token in console.tokens.all() if token.kind == canarytools.CanaryTokenKinds.DOC_MSWORD]
+            >>> results = console.tokens.download_many(tokens, '/srv/rollout')
+        """
+        return self.console.map(lambda token: token.download(directory=directory, **kwargs), tokens,
+                                max_workers=max_workers)
 
     def parse(self, data):
         """Parse JSON data
@@ -138,6 +443,9 @@ class CanaryTokens(object):
 
 
 class CanaryToken(CanaryToolsBase):
+    _fields = frozenset(['console', 'canarytoken', 'kind', 'memo', 'enabled', 'flock_id', 'triggered_count',
+                         'created', 'created_printable', 'updated_id', 'url', 'hostname', 'node_id', 'key'])
+
     def __init__(self, console, data):
         """Initialize a CanaryToken object
 
@@ -154,6 +462,42 @@ class CanaryToken(CanaryToolsBase):
         """
         super(CanaryToken, self).__setattr__(key, value)
 
+    def __getattr__(self, key):
+        """Fetch the full token detail on first access to an attribute
+            missing from a light listing.
+        """
+        if key.startswith('_') or key in ('console', 'canarytoken') or self._flag('_hydrated', True):
+            return super(CanaryToken, self).__getattr__(key)
+        self.hydrate()
+        return getattr(self, key)
+
+    def hydrate(self):
+        """Fetch the full detail, including endpoints, of a token from a light listing.
+            Only the fields missing from the listing are filled in, the listed ones are kept.
+            Does nothing if the detail has already been fetched.
+
+        :except CanaryTokenError: Could not find the CanaryToken
+
+        Usage::
+
+            >>> import canarytools
+            >>> token = console.tokens.all()[0]
+            >>> token.hydrate()
+        """
+        if self._flag('_hydrated', True):
+            return
+        # mark first so a failed lookup can't recurse back here
+        self._hydrated = True
+        try:
+            listed = self._attributes()
+            detail = self.console.tokens.get_detail(self.canarytoken, listed.get('updated_id'))
+            for key, value in detail._attributes().items():
+                if key not in listed:
+                    self._set(key, value)
+        except Exception:
+            self._hydrated = False
+            raise
+
     def __str__(self):
         """Helper method"""
         return "[Canarytoken] kind: {kind}; memo: {memo}; enabled: {enabled};" \
@@ -178,7 +522,9 @@ class CanaryToken(CanaryToolsBase):
             >>> result = token.update(memo='Token in downloads folder')
         """
         params = {'memo': memo, 'canarytoken': self.canarytoken}
-        return self.console.post('canarytoken/update', params)
+        r = self.console.post('canarytoken/update', params)
+        self.console.tokens.discard(self.canarytoken)
+        return r
 
     def delete(self):
         """Delete a Canarytoken
@@ -195,7 +541,9 @@ class CanaryToken(CanaryToolsBase):
             >>> result = token.delete()
         """
         params = {'canarytoken': self.canarytoken}
-        return self.console.post('canarytoken/delete', params)
+        r = self.console.post('canarytoken/delete', params)
+        self.console.tokens.discard(self.canarytoken)
+        return r
 
     def disable(self):
         """Disable a Canarytoken
@@ -212,7 +560,9 @@ class CanaryToken(CanaryToolsBase):
             >>> result = token.disable()
         """
         params = {'canarytoken': self.canarytoken}
-        return self.console.post('canarytoken/disable', params)
+        r = self.console.post('canarytoken/disable', params)
+        self.console.tokens.discard(self.canarytoken)
+        return r
 
     def enable(self):
         """Enable a Canarytoken
@@ -229,16 +579,28 @@ class CanaryToken(CanaryToolsBase):
             >>> result = token.enable()
         """
         params = {'canarytoken': self.canarytoken}
-        return self.console.post('canarytoken/enable', params)
+        r = self.console.post('canarytoken/enable', params)
+        self.console.tokens.discard(self.canarytoken)
+        return r
     
-    def download(self, filename=None):
-        """Download a Canarytoken
+    def download(self, filename=None, directory=None, resume=True, checksum=None, algorithm='sha256',
+                 chunk_size=64 * 1024, retries=3):
+        """Download a Canarytoken. The file is streamed to disk in chunks, to a temporary
+            ``.part`` file that is renamed once complete. An interrupted download is resumed
+            from where it stopped, both within a call and by a later call.
 
         :param filename: Optional target filename. The console should provide a default value.
+        :param directory: Directory the file is written to. Defaults to the current directory
+        :param resume: Continue a partial download with an HTTP ``Range`` request
+        :param checksum: Optional expected hex digest of the file
+        :param algorithm: ``hashlib`` algorithm of ``checksum``
+        :param chunk_size: Number of bytes read at a time
+        :param retries: Number of times an interrupted transfer is resumed before giving up
         :return: The filename written to.
         :rtype: :class:`str`
 
-        :except CanaryTokenError: Something went wrong while downloading the CanaryToken.
+        :except CanaryTokenError: Something went wrong while downloading the CanaryToken, or the checksum
+            didn't match.
         :except ValueError: This token doesn't have a default filename, you need to provide one.
 
         Usage::
@@ -249,18 +611,76 @@ class CanaryToken(CanaryToolsBase):
             OR
             >>> filename = token.download()
         """
-        resp = self.console.get('canarytoken/download', {'canarytoken': self.canarytoken}, raw_resp=True)
-        disp = resp.headers['Content-Disposition'].split('filename=')
-        if not filename:
-            if len(disp) == 2 and disp[0] == 'attachment; ':
-                filename = disp[-1]
-            else:
-                raise ValueError('CanaryToken.download() requires filename for this token')
-        with open(filename, 'wb') as fd:
-            fd.write(resp.content)
+        if filename and directory:
+            filename = os.path.join(directory, filename)
+        # partial downloads are kept under the token's key until the console names the file
+        part = (filename or os.path.join(directory or '', '.{0}'.format(self.canarytoken))) + '.part'
+
+        attempt = 0
+        while True:
+            offset = os.path.getsize(part) if resume and os.path.exists(part) else 0
+            # byte ranges only line up with the file if it isn't compressed in transit
+            headers = {'Accept-Encoding': 'identity'}
+            if offset:
+                headers['Range'] = 'bytes={0}-'.format(offset)
+            try:
+                resp = self.console.get('canarytoken/download', {'canarytoken': self.canarytoken},
+                                        raw_resp=True, stream=True, headers=headers)
+            except requests.exceptions.HTTPError as e:
+                if offset and e.response is not None and e.response.status_code == 416:
+                    # the partial file doesn't match what the console has, start over
+                    os.remove(part)
+                    continue
+                raise CanaryTokenError(str(e))
+
+            with resp:
+                if not filename:
+                    disp = resp.headers.get('Content-Disposition', '').split('filename=')
+                    if len(disp) == 2 and disp[0] == 'attachment; ':
+                        filename = os.path.join(directory or '', os.path.basename(disp[-1].strip('"')))
+                    else:
+                        raise ValueError('CanaryToken.download() requires filename for this token')
+                # a 200 rather than a 206 means the console sent the whole file
+                mode = 'ab' if offset and resp.status_code == 206 else 'wb'
+                try:
+                    with open(part, mode) as fd:
+                        for chunk in resp.iter_content(chunk_size=chunk_size):
+                            fd.write(chunk)
+                except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    if not resume or attempt >= retries:
+                        raise CanaryTokenError('Download of Canarytoken {0} was interrupted: {1}'.format(
+                            self.canarytoken, e))
+                    attempt += 1
+                    continue
+            break
+
+        if checksum is not None:
+            digest = hashlib.new(algorithm)
+            with open(part, 'rb') as fd:
+                for chunk in iter(lambda: fd.read(chunk_size), b''):
+                    digest.update(chunk)
+            if digest.hexdigest() != checksum.lower():
+                os.remove(part)
+                raise CanaryTokenError('Checksum mismatch for Canarytoken {0}: expected {1}, got {2}'.format(
+                    self.canarytoken, checksum, digest.hexdigest()))
+        os.replace(part, filename)
         return filename
 
 
+def spec_key(spec, seen):
+    """Key identifying a :meth:`CanaryTokens.create_many` spec in its manifest. Identical
+        specs are told apart by the order they appear in.
+
+    :param spec: Dictionary of create arguments
+    :param seen: Dictionary counting the specs seen so far, updated in place
+    :return: The key
+    """
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    seen[digest] = seen.get(digest, 0) + 1
+    return '{0}:{1}'.format(digest, seen[digest])
+
+
 class CanaryTokenKinds(object):
     AWS = 'aws-id'
     AWSS3 = 'aws-s3'
@@ -282,3 +702,245 @@ class CanaryTokenKinds(object):
     WEB_IMAGE = 'web-image'
     WINDOWS_DIR = 'windows-dir'
     WIREGUARD = 'wireguard'
+
+
+class TokenIndex(object):
+    def __init__(self, console, tokens=None):
+        """In-memory index of a console's Canarytokens for fast lookups by key, kind, flock,
+            enabled state and memo. Memo lookups are case insensitive, by prefix or by substring.
+
+            Creating, updating, deleting, enabling and disabling tokens through the index
+            keeps it up to date without fetching the tokens again. Tokens are indexed on the
+            fields they hold, so tokens of a light listing aren't fetched one by one.
+
+        :param console: The Console from which API calls are made
+        :param tokens: Tokens to index. By default all the console's tokens are fetched
+
+        Usage::
+
+            >>> import canarytools
+            >>> index = canarytools.TokenIndex(console)
+            >>> tokens = index.find(kind=canarytools.CanaryTokenKinds.DOC_MSWORD, memo_contains='laptop')
+            >>> index.disable(tokens[0])
+        """
+        self.console = console
+        self._lock = threading.RLock()
+        self.load(self.console.tokens.all() if tokens is None else tokens)
+
+    def load(self, tokens):
+        """Replace the contents of the index
+
+        :param tokens: List of :class:`CanaryToken <CanaryToken>` objects
+        """
+        with self._lock:
+            self._by_key = {}
+            self._by_kind = {}
+            self._by_flock = {}
+            self._by_enabled = {}
+            # lower cased memo of each token
+            self._memo_of = {}
+            # sorted (memo, key) pairs for prefix lookups
+            self._memos = []
+            # memo trigrams for substring lookups
+            self._trigrams = {}
+            for token in tokens:
+                self.add(token)
+
+    def refresh(self):
+        """Fetch all tokens again and rebuild the index"""
+        self.load(self.console.tokens.all())
+
+    def add(self, token):
+        """Add a token to the index, replacing any token with the same key
+
+        :param token: :class:`CanaryToken <CanaryToken>` object
+        """
+        with self._lock:
+            self.remove(token.canarytoken)
+            key = token.canarytoken
+            # read without going through __getattr__, which would hydrate the token
+            fields = token._attributes()
+            self._by_key[key] = token
+            self._by_kind.setdefault(fields.get('kind'), {})[key] = token
+            self._by_flock.setdefault(fields.get('flock_id'), {})[key] = token
+            self._by_enabled.setdefault(bool(fields.get('enabled', False)), {})[key] = token
+            memo = (fields.get('memo') or '').lower()
+            self._memo_of[key] = memo
+            bisect.insort(self._memos, (memo, key))
+            for trigram in trigrams(memo):
+                self._trigrams.setdefault(trigram, set()).add(key)
+
+    def remove(self, token):
+        """Remove a token from the index. Does nothing if it isn't indexed
+
+        :param token: :class:`CanaryToken <CanaryToken>` object or token key
+        """
+        key = token.canarytoken if isinstance(token, CanaryToken) else token
+        with self._lock:
+            token = self._by_key.pop(key, None)
+            if token is None:
+                return
+            fields = token._attributes()
+            self._by_kind.get(fields.get('kind'), {}).pop(key, None)
+            self._by_flock.get(fields.get('flock_id'), {}).pop(key, None)
+            for tokens in self._by_enabled.values():
+                tokens.pop(key, None)
+            memo = self._memo_of.pop(key)
+            i = bisect.bisect_left(self._memos, (memo, key))
+            if i < len(self._memos) and self._memos[i] == (memo, key):
+                del self._memos[i]
+            for trigram in trigrams(memo):
+                keys = self._trigrams.get(trigram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._trigrams[trigram]
+
+    def get(self, key):
+        """Look up a token by key
+
+        :param key: The canarytoken key
+        :return: The :class:`CanaryToken <CanaryToken>` or ``None``
+        """
+        return self._by_key.get(key)
+
+    def by_kind(self, kind):
+        """Tokens of a kind, e.g. ``CanaryTokenKinds.DOC_MSWORD``"""
+        return list(self._by_kind.get(kind, {}).values())
+
+    def by_flock(self, flock_id):
+        """Tokens in a flock"""
+        return list(self._by_flock.get(flock_id, {}).values())
+
+    def memo_prefix(self, prefix):
+        """Tokens whose memo starts with ``prefix``"""
+        prefix = prefix.lower()
+        with self._lock:
+            i = bisect.bisect_left(self._memos, (prefix, ''))
+            tokens = []
+            while i < len(self._memos) and self._memos[i][0].startswith(prefix):
+                tokens.append(self._by_key[self._memos[i][1]])
+                i += 1
+            return tokens
+
+    def memo_contains(self, text):
+        """Tokens whose memo contains ``text``"""
+        return [self._by_key[key] for key in self._memo_keys(text.lower())]
+
+    def find(self, kind=None, flock_id=None, enabled=None, memo_prefix=None, memo_contains=None):
+        """Tokens matching all the given filters
+
+        :param kind: Kind of Canarytoken
+        :param flock_id: Id of the flock
+        :param enabled: ``True`` or ``False`` to filter on the enabled state
+        :param memo_prefix: Start of the memo
+        :param memo_contains: Part of the memo
+        :return: List of :class:`CanaryToken <CanaryToken>` objects
+        """
+        with self._lock:
+            candidates = []
+            if kind is not None:
+                candidates.append(self._by_kind.get(kind, {}))
+            if flock_id is not None:
+                candidates.append(self._by_flock.get(flock_id, {}))
+            if enabled is not None:
+                candidates.append(self._by_enabled.get(bool(enabled), {}))
+            prefix = memo_prefix.lower() if memo_prefix is not None else None
+            text = memo_contains.lower() if memo_contains is not None else None
+
+            if candidates:
+                # intersect starting from the smallest index
+                candidates.sort(key=len)
+                keys = candidates[0].keys()
+                for other in candidates[1:]:
+                    keys = keys & other.keys()
+            elif prefix is not None:
+                keys = [token.canarytoken for token in self.memo_prefix(prefix)]
+                prefix = None
+            elif text is not None:
+                keys = list(self._memo_keys(text))
+                text = None
+            else:
+                return list(self._by_key.values())
+
+            # check the remaining memo filters directly on the few candidates left
+            if prefix is not None:
+                keys = [key for key in keys if self._memo_of[key].startswith(prefix)]
+            if text is not None:
+                keys = [key for key in keys if text in self._memo_of[key]]
+            return [self._by_key[key] for key in keys]
+
+    def create(self, memo, kind, **kwargs):
+        """Create a Canarytoken and add it to the index. See :meth:`CanaryTokens.create`
+
+        :return: The new :class:`CanaryToken <CanaryToken>`
+        """
+        token = self.console.tokens.create(memo, kind, **kwargs)
+        self.add(token)
+        return token
+
+    def update(self, token, memo):
+        """Update a token's memo and its index entries. See :meth:`CanaryToken.update`"""
+        token = self._token(token)
+        result = token.update(memo)
+        with self._lock:
+            self.remove(token)
+            token.memo = memo
+            self.add(token)
+        return result
+
+    def delete(self, token):
+        """Delete a token and remove it from the index. See :meth:`CanaryToken.delete`"""
+        token = self._token(token)
+        result = token.delete()
+        self.remove(token)
+        return result
+
+    def enable(self, token):
+        """Enable a token and update its index entries. See :meth:`CanaryToken.enable`"""
+        return self._set_enabled(self._token(token), True)
+
+    def disable(self, token):
+        """Disable a token and update its index entries. See :meth:`CanaryToken.disable`"""
+        return self._set_enabled(self._token(token), False)
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(list(self._by_key.values()))
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def _set_enabled(self, token, enabled):
+        result = token.enable() if enabled else token.disable()
+        with self._lock:
+            self.remove(token)
+            token.enabled = enabled
+            self.add(token)
+        return result
+
+    def _token(self, token):
+        if isinstance(token, CanaryToken):
+            return token
+        indexed = self._by_key.get(token)
+        return indexed if indexed is not None else self.console.tokens.get_token(token)
+
+    def _memo_keys(self, text):
+        with self._lock:
+            if len(text) < 3:
+                return set(key for memo, key in self._memos if text in memo)
+            keys = None
+            for trigram in trigrams(text):
+                matches = self._trigrams.get(trigram)
+                if not matches:
+                    return set()
+                keys = set(matches) if keys is None else keys & matches
+            # trigrams can match out of order, check the candidates
+            return set(key for key in keys if text in self._memo_of[key])
+
+
+def trigrams(text):
+    """Set of the three character substrings of a string"""
+    return set(text[i:i + 3] for i in range(len(text) - 2))
@@ -23,6 +23,10 @@ class DataBundles(object):
 
 
 class DataBundle(CanaryToolsBase):
+    _fields = frozenset(['console', 'settings_key', 'req_len', 'bytes_copied', 'name', 'checksum', 'ended_time',
+                         'tag', 'type', 'bundle_size', 'state', 'node_id', 'started_time', 'created_time',
+                         'updated_time'])
+
     def __init__(self, console, data):
         """Initilaize a DataBundle object
 
@@ -3,7 +3,7 @@ from .result import Result
 
 from .databundles import DataBundles
 
-from dateutil.parser import parse
+from .timestamps import parse_timestamp
 
 
 class Devices(object):
@@ -14,9 +14,14 @@ class Devices(object):
         """
         self.console = console
 
-    def all(self):
+    def all(self, hydrate=False, stream=False):
         """Get all registered devices
 
+        :param hydrate: Fetch the full device detail for every device up front, one request per device.
+            By default devices are built from the listing and the full detail is only fetched when an
+            attribute missing from the listing is accessed
+        :param stream: Decode the response incrementally and return a generator instead of a list.
+            Requires ijson
         :return: List of all devices
         :rtype: List of :class:`Device <Device>` objects
 
@@ -26,11 +31,21 @@ class Devices(object):
               >>> devices = console.devices.all()
         """
         params = {'tz': self.console.tz}
-        return self.console.get('devices/all', params, self.parse)
-
-    def live(self):
+        # fetch the unacknowledged incidents once for the whole listing
+        self.console.incident_index.invalidate()
+        if stream:
+            return self._stream('devices/all', params, hydrate)
+        devices = self.console.get('devices/all', params, self.parse)
+        if hydrate:
+            for device in devices:
+                device.hydrate()
+        return devices
+
+    def live(self, hydrate=False, stream=False):
         """Get all registered connected devices
 
+        :param hydrate: Fetch the full device detail for every device up front. See :meth:`all`
+        :param stream: Decode the response incrementally and return a generator instead of a list. See :meth:`all`
         :return: List of live devices
         :rtype: List of :class:`Device <Device>` objects
 
@@ -40,11 +55,21 @@ class Devices(object):
               >>> devices = console.devices.live()
         """
         params = {'tz': self.console.tz}
-        return self.console.get('devices/live', params, self.parse)
-
-    def dead(self):
+        # fetch the unacknowledged incidents once for the whole listing
+        self.console.incident_index.invalidate()
+        if stream:
+            return self._stream('devices/live', params, hydrate)
+        devices = self.console.get('devices/live', params, self.parse)
+        if hydrate:
+            for device in devices:
+                device.hydrate()
+        return devices
+
+    def dead(self, hydrate=False, stream=False):
         """Get all registered disconnected devices
 
+        :param hydrate: Fetch the full device detail for every device up front. See :meth:`all`
+        :param stream: Decode the response incrementally and return a generator instead of a list. See :meth:`all`
         :return: List of dead devices
         :rtype: List of :class:`Device <Device>` objects
 
@@ -54,7 +79,15 @@ class Devices(object):
               >>> devices = console.devices.dead()
         """
         params = {'tz': self.console.tz}
-        return self.console.get('devices/dead', params, self.parse)
+        # fetch the unacknowledged incidents once for the whole listing
+        self.console.incident_index.invalidate()
+        if stream:
+            return self._stream('devices/dead', params, hydrate)
+        devices = self.console.get('devices/dead', params, self.parse)
+        if hydrate:
+            for device in devices:
+                device.hydrate()
+        return devices
 
     def get_device(self, node_id, settings = False):
         """Get information on a particular device
@@ -73,8 +106,27 @@ class Devices(object):
         params = {'node_id': node_id, 'settings': settings}
         return self.console.get('device/getinfo', params, self.parse)
 
+    def _stream(self, url, params, hydrate):
+        for device in self.console.stream(url, params, 'devices', self._parse_listed):
+            if hydrate:
+                device.hydrate()
+            yield device
+
+    def _parse_listed(self, data):
+        """Build a Device straight from a listing, full detail is fetched on demand"""
+        # the devices of a listing resolve their incidents through one fetch of the whole index
+        index = self.console.incident_index
+        if data.get('unacknowleged_incidents') and not index.loaded:
+            index.refresh()
+        device = Device.parse(self.console, data)
+        device._hydrated = False
+        return device
+
     def parse(self, data):
-        """Parse JSON data
+        """Parse JSON data. Listed devices resolve their unacknowledged incidents through
+            the Console's incident index, which the caller invalidates before fetching a
+            listing, see :meth:`all`. A single device fetches only its own incidents
+            unless the index is already loaded
 
         :param data: JSON data
         :return: Device object or a list if Device objects
@@ -82,14 +134,41 @@ class Devices(object):
         if data and 'devices' in data:
             devices = list()
             for device in data['devices']:
-                devices.append(self.get_device(device['id']))
+                devices.append(self._parse_listed(device))
             return devices
         elif data and 'device' in data:
+            self.console.incident_index.allow_update()
             return Device.parse(self.console, data['device'])
         return list()
 
 
+# json attributes to ignore
+IGNORED_FIELDS = frozenset(['first_seen', 'first_seen_printable', 'last_heartbeat', 'last_heartbeat_printable', 'mac'])
+
+RENAMED_FIELDS = {'device_live': 'live', 'device_id': 'id'}
+
+BOOL_FIELDS = frozenset(['ghost', 'ignore_notifications_disconnect', 'ignore_notifications_general', 'need_reboot',
+                         'notify_after_horizon_reconnect', 'device_live'])
+
+TIMESTAMP_FIELDS = frozenset(['first_seen_std', 'last_seen_std'])
+
+INT_FIELDS = frozenset(['reconnect_count', 'service_count'])
+
+# fields changed by a reboot or update, fetched again on access once the device is stale
+REBOOT_FIELDS = frozenset(['live', 'need_reboot', 'uptime', 'uptime_age', 'last_heartbeat_age', 'last_seen',
+                           'reconnect_count'])
+
+UPDATE_FIELDS = REBOOT_FIELDS | frozenset(['version'])
+
+
 class Device(CanaryToolsBase):
+    _fields = frozenset(['console', 'id', 'node_id', 'name', 'description', 'uptime_age', 'first_seen',
+                         'last_heartbeat_age', 'uptime', 'need_reboot', 'reconnect_count', 'live', 'mac_address',
+                         'ignore_notifications_disconnect', 'notify_after_horizon_reconnect', 'sensor',
+                         'first_seen_age', 'ignore_notifications_general', 'device_id_hash', 'service_count',
+                         'ip_address', 'ippers', 'ghost', 'unacknowleged_incidents', 'last_seen', 'flock_id',
+                         'location', 'version'])
+
     def __init__(self, console, data):
         """:class:`Device <Device>` Initialize a Device object
 
@@ -125,60 +204,50 @@ class Device(CanaryToolsBase):
 
     def __setattr__(self, key, value):
         """Override base class implementation."""
-        # json attributes to ignore
-        if key in ['first_seen', 'first_seen_printable',
-                   'last_heartbeat', 'last_heartbeat_printable', 'mac']:
+        if key in IGNORED_FIELDS:
             return
 
         # rename keys
-        if 'device_live' == key:
-            key = 'live'
-        elif 'device_id' == key:
-            key = 'id'
+        key = RENAMED_FIELDS.get(key, key)
 
         # update string bool values
-        if key in ['ghost', 'ignore_notifications_disconnect',
-                            'ignore_notifications_general', 'need_reboot',
-                            'notify_after_horizon_reconnect', 'device_live']:
+        if key in BOOL_FIELDS:
             value = value == 'True'
 
         # get unack'd incidents for this device and look them up
         if 'unacknowleged_incidents' == key:
-            unacknowleged_incidents = list()
-
-            if hasattr(self, 'id'):
-                node_id = self.id
-            else:
-                node_id = None
-
-            all_unacked_incidents = self.console.incidents.unacknowledged(node_id=node_id)
-
-            for device_incident in value:
-                for incident in all_unacked_incidents:
-                    if device_incident['key'] == incident.id:
-                        unacknowleged_incidents.append(incident)
-                        break
-            value = unacknowleged_incidents
+            value = self.console.incident_index.resolve(
+                [device_incident['key'] for device_incident in value], node_id=self._flag('id'))
 
         # remove 'std' from key name and create datetime object from date string
-        if key in ['first_seen_std', 'last_seen_std']:
+        if key in TIMESTAMP_FIELDS:
             key = key[:-4]
-            if value:
-                value = parse(value)
-            else:
-                value = None
+            value = parse_timestamp(value)
 
-        if key in ['uptime']:
+        if 'uptime' == key:
             try:
                 value = long(value)
             except NameError:
                 value = int(value)
 
-        if key in ['reconnect_count', 'service_count']:
+        if key in INT_FIELDS:
             value = int(value)
 
         super(Device, self).__setattr__(key, value)
 
+    def __getattr__(self, key):
+        """Fetch the full device detail on first access to an attribute
+            missing from a listing, or dropped by a change while stale.
+        """
+        if key.startswith('_') or key in ('console', 'id') or \
+                (self._flag('_hydrated', True) and not self.stale):
+            return super(Device, self).__getattr__(key)
+        if self.stale:
+            self.refresh()
+        else:
+            self.hydrate()
+        return getattr(self, key)
+
     def __str__(self):
         """Helper method"""
         # ghost devices won't have an ip, so check
@@ -208,7 +277,7 @@ class Device(CanaryToolsBase):
         params = {'node_id': self.node_id}
         r = self.console.post('device/reboot', params)
 
-        self.refresh()
+        self._mutated({}, REBOOT_FIELDS)
 
         return r
 
@@ -232,7 +301,7 @@ class Device(CanaryToolsBase):
         params = {'node_id': self.node_id, 'update_tag': update_tag}
         r = self.console.post('device/update', params)
 
-        self.refresh()
+        self._mutated({}, UPDATE_FIELDS)
 
         return r
 
@@ -264,10 +333,33 @@ class Device(CanaryToolsBase):
             >>> device.refresh()
         """
         devices = Devices(self.console)
-        device = devices.get_device(self.node_id)
+        device = devices.get_device(self.id)
+
+        self._update(device)
+        self._hydrated = True
+
+    def hydrate(self):
+        """Fetch the full device detail for a Device built from a listing.
+            Does nothing if the detail has already been fetched.
+
+        :except DeviceNotFoundError: The device could not be found
+
+        Usage::
+
+            >>> import canarytools
+            >>> device = console.devices.all()[0]
+            >>> device.hydrate()
+        """
+        if self._flag('_hydrated', True):
+            return
+        # mark first so a failed lookup inside refresh can't recurse back here
+        self._hydrated = True
+        try:
+            self.refresh()
+        except Exception:
+            self._hydrated = False
+            raise
 
-        self.__dict__.update(device.__dict__)
-    
     def settings(self) -> dict:
         """Get a device's settings
 
@@ -285,5 +377,5 @@ class Device(CanaryToolsBase):
         devices = Devices(self.console)
         device = devices.get_device(self.node_id, True)
 
-        self.__dict__.update(device.__dict__)
+        self._update(device)
         return Result(self.console, self.settings)
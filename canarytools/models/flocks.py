@@ -27,7 +27,20 @@ class Flocks(object):
             >>> result = console.flocks.create(name='Cape Town')
         """
         params = {'name': name}
-        return self.console.post('flock/create', params, self.parse)
+        return self.console.post('flock/create', params, lambda data: self.parse_created(data, name))
+
+    def parse_created(self, data, name):
+        """Parse the response to a flock/create request. The console only returns
+            the new flock's id, so the Flock is built from it and the given name
+            rather than by fetching all flocks.
+
+        :param data: JSON data returned from the web API
+        :param name: Name the Flock was created with
+        :return: The new Flock
+        """
+        if data and 'flock_id' in data and 'flock' not in data:
+            return Flock.parse(self.console, {'flock_id': data['flock_id'], 'name': name})
+        return self.parse(data)
 
     def all(self):
         """Fetch all Flocks
@@ -67,6 +80,8 @@ class Flocks(object):
 
 
 class Flock(CanaryToolsBase):
+    _fields = frozenset(['console', 'flock_id', 'name'])
+
     def __init__(self, console, data):
         """Initialize a Flock object
 
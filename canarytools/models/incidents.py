@@ -1,8 +1,14 @@
 from copy import deepcopy
 import datetime
-from dateutil.parser import parse
+import threading
 
+try:
+    from collections.abc import Sequence
+except ImportError:
+    # python 2
+    from collections import Sequence
 from .base import CanaryToolsBase
+from .timestamps import parse_timestamp
 from ..exceptions import IncidentError
 
 
@@ -12,12 +18,14 @@ class Incidents(object):
         """
         self.console = console
 
-    def all(self, node_id=None, event_limit=None, newer_than=None):
+    def all(self, node_id=None, event_limit=None, newer_than=None, stream=False):
         """Get all incidents for this console.
 
         :param node_id: Get all incidents for a specific node
         :param event_limit: Specify the maximum number of event logs to be returned with the incident.
         :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param stream: Decode the response incrementally and return a generator instead of a list.
+            Requires ijson
         :return: List of Incident objects
         :rtype: List of :class:`Incident <Incident>` objects
 
@@ -27,14 +35,18 @@ class Incidents(object):
             >>> incidents = console.incidents.all()
         """
         params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        if stream:
+            return self.console.stream('incidents/all', params, 'incidents', self.parse_incident)
         return self.console.get('incidents/all', params, self.parse)
 
-    def unacknowledged(self, node_id=None, event_limit=None, newer_than=None):
+    def unacknowledged(self, node_id=None, event_limit=None, newer_than=None, stream=False):
         """Get list of all unacknowledged incidents for a console.
 
         :param node_id: Get all unacknowledged incidents for a specific node
         :param event_limit: Specify the maximum number of event logs to be returned with the incident.
         :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param stream: Decode the response incrementally and return a generator instead of a list.
+            Requires ijson
         :return: Return list of all unacknowledged Incidents
         :rtype: List of :class:`Incident <Incident>` objects
 
@@ -44,14 +56,18 @@ class Incidents(object):
             >>> incidents = console.incidents.unacknowledged()
         """
         params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        if stream:
+            return self.console.stream('incidents/unacknowledged', params, 'incidents', self.parse_incident)
         return self.console.get('incidents/unacknowledged', params, self.parse)
 
-    def acknowledged(self, node_id=None, event_limit=None, newer_than=None):
+    def acknowledged(self, node_id=None, event_limit=None, newer_than=None, stream=False):
         """Get list of all acknowledged incidents for a console.
 
         :param node_id: Get all acknowledged incidents for a specific node
         :param event_limit: Specify the maximum number of event logs to be returned with the incident
         :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param stream: Decode the response incrementally and return a generator instead of a list.
+            Requires ijson
         :return: Return list of all acknowledged incidents
         :rtype: List of :class:`Incident <Incident>` objects
 
@@ -61,8 +77,90 @@ class Incidents(object):
             >>> incidents = console.incidents.acknowledged()
         """
         params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit, 'newer_than': newer_than}
+        if stream:
+            return self.console.stream('incidents/acknowledged', params, 'incidents', self.parse_incident)
         return self.console.get('incidents/acknowledged', params, self.parse)
 
+    def iter_all(self, node_id=None, event_limit=None, newer_than=None, page_size=100):
+        """Iterate over all incidents for this console, one page at a time.
+            Incidents are yielded as each page arrives, so memory use depends on
+            the page size rather than on the number of incidents.
+
+        :param node_id: Get all incidents for a specific node
+        :param event_limit: Specify the maximum number of event logs to be returned with the incident.
+        :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param int page_size: Number of incidents requested per page
+        :return: Generator of Incident objects
+        :rtype: Generator of :class:`Incident <Incident>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> for incident in console.incidents.iter_all(page_size=500):
+            >>>     print(incident.src_host)
+        """
+        return self._iter_pages('incidents/all', node_id, event_limit, newer_than, page_size)
+
+    def iter_unacknowledged(self, node_id=None, event_limit=None, newer_than=None, page_size=100):
+        """Iterate over all unacknowledged incidents, one page at a time. See :meth:`iter_all`
+
+        :param node_id: Get all unacknowledged incidents for a specific node
+        :param event_limit: Specify the maximum number of event logs to be returned with the incident.
+        :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param int page_size: Number of incidents requested per page
+        :return: Generator of Incident objects
+        :rtype: Generator of :class:`Incident <Incident>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> for incident in console.incidents.iter_unacknowledged():
+            >>>     incident.acknowledge()
+        """
+        return self._iter_pages('incidents/unacknowledged', node_id, event_limit, newer_than, page_size)
+
+    def iter_acknowledged(self, node_id=None, event_limit=None, newer_than=None, page_size=100):
+        """Iterate over all acknowledged incidents, one page at a time. See :meth:`iter_all`
+
+        :param node_id: Get all acknowledged incidents for a specific node
+        :param event_limit: Specify the maximum number of event logs to be returned with the incident.
+        :param str newer_than: limit to incidents newer than a date like '2019-12-25-12:00:00' (UTC)
+        :param int page_size: Number of incidents requested per page
+        :return: Generator of Incident objects
+        :rtype: Generator of :class:`Incident <Incident>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> for incident in console.incidents.iter_acknowledged():
+            >>>     incident.delete()
+        """
+        return self._iter_pages('incidents/acknowledged', node_id, event_limit, newer_than, page_size)
+
+    def _iter_pages(self, url, node_id, event_limit, newer_than, page_size):
+        """Page through an incidents endpoint. Follows the console's ``cursor`` when
+            it returns one, and otherwise moves on with the ``incidents_since``
+            update id cursor while pages come back full.
+        """
+        params = {'tz': self.console.tz, 'node_id': node_id, 'event_limit': event_limit,
+                  'newer_than': newer_than, 'limit': page_size}
+        since = None
+        while True:
+            data = self.console.get(url, params, lambda data: data)
+            page = data.get('incidents', []) if data else []
+            for incident in page:
+                yield self.parse_incident(incident)
+
+            cursor = (data.get('cursor') or {}).get('next') if data else None
+            max_updated_id = data.get('max_updated_id') if data else None
+            if cursor:
+                params = dict(params, cursor=cursor)
+            elif len(page) >= page_size and max_updated_id is not None and max_updated_id != since:
+                since = max_updated_id
+                params = dict(params, incidents_since=since)
+            else:
+                return
+
     def acknowledge(self, node_id=None, src_host=None, older_than=None):
         """Mark all incidents as acknowledged. Use parameters to filter which
             incidents are acknowledged. Calling this method with no parameters
@@ -150,6 +248,72 @@ class Incidents(object):
         params = {'node_id': node_id, 'src_host': src_host, 'older_than': older_than}
         return self.console.post('incidents/delete', params)
 
+    def acknowledge_many(self, incidents, refresh=False, max_workers=None):
+        """Acknowledge a list of incidents concurrently. Incident objects passed in
+            are marked as acknowledged in place.
+
+        :param incidents: List of incident ids or :class:`Incident <Incident>` objects
+        :param refresh: Fetch each Incident object again after acknowledging it
+        :param max_workers: Maximum number of concurrent requests. Defaults to the Console's ``max_workers``
+        :return: Outcome for each incident in the order given, the ``item`` of each being the incident id
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> results = console.incidents.acknowledge_many(['incident:ftplogin:0e4b47', 'incident:ftplogin:0e4b48'])
+            >>> failed = [r.item for r in results if not r.ok]
+        """
+        def acknowledge(incident):
+            result = self.console.post('incident/acknowledge', {'incident': self._incident_id(incident)})
+            if isinstance(incident, Incident):
+                # converted like the console's JSON string value
+                incident.acknowledged = 'True'
+                if refresh:
+                    incident.refresh()
+            return result
+
+        results = self._many(acknowledge, incidents, max_workers)
+        self.console.incident_index.discard(result.item for result in results if result.ok)
+        return results
+
+    def delete_many(self, incidents, max_workers=None):
+        """Delete a list of acknowledged incidents concurrently
+
+        :param incidents: List of incident ids or :class:`Incident <Incident>` objects
+        :param max_workers: Maximum number of concurrent requests. Defaults to the Console's ``max_workers``
+        :return: Outcome for each incident in the order given, the ``item`` of each being the incident id.
+            Unacknowledged Incident objects fail with an :class:`IncidentError <IncidentError>`
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+
+        Usage::
+
+            >>> import canarytools
+            >>> incidents = console.incidents.acknowledged()
+            >>> results = console.incidents.delete_many(incidents)
+        """
+        def delete(incident):
+            # Incident must be acknowledged in order to delete
+            if isinstance(incident, Incident) and incident.acknowledged == False:
+                raise IncidentError('Cannot delete an unacknowledged Incident')
+            return self.console.delete('incident/delete', {'incident': self._incident_id(incident)})
+
+        results = self._many(delete, incidents, max_workers)
+        self.console.incident_index.discard(result.item for result in results if result.ok)
+        return results
+
+    def _many(self, func, incidents, max_workers):
+        incidents = list(incidents)
+        results = self.console.map(func, incidents, max_workers=max_workers)
+        # report by id rather than by object
+        for result in results:
+            result.item = self._incident_id(result.item)
+        return results
+
+    @staticmethod
+    def _incident_id(incident):
+        return incident.id if isinstance(incident, Incident) else incident
+
     def get_incident(self, incident_id):
         """Get an Incident.
 
@@ -177,12 +341,7 @@ class Incidents(object):
         if data and 'incidents' in data:
             # loop over each incident in the JSON response
             for incident in data['incidents']:
-                if incident['summary'] in INCIDENT_MAP:
-                    incidents.append(INCIDENT_MAP[incident['summary']].parse(
-                        self.console, incident))
-                else:
-                    incidents.append(INCIDENT_MAP['Default'].parse(
-                        self.console, incident))
+                incidents.append(self.parse_incident(incident))
         elif data and 'incident' in data:
             data = data['incident']
             if data['description'] in INCIDENT_MAP:
@@ -193,8 +352,137 @@ class Incidents(object):
 
         return incidents
 
+    def parse_incident(self, data):
+        """Parse the JSON data of a single incident from a listing
+
+        :param data: JSON data of the incident
+        :return: An Incident object
+        """
+        if data['summary'] in INCIDENT_MAP:
+            return INCIDENT_MAP[data['summary']].parse(self.console, data)
+        return INCIDENT_MAP['Default'].parse(self.console, data)
+
+
+class IncidentIndex(object):
+    def __init__(self, console):
+        """Index of a console's unacknowledged incidents keyed by incident id. A single
+            index is kept per Console and shared by all Device objects, so a device listing
+            costs one incidents fetch in total.
+
+        :param console: The Console from which API calls are made
+        """
+        self.console = console
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._loaded = False
+        self._updated = False
+        self._last_fetch = None
+
+    def __getstate__(self):
+        # the lock can't be pickled, a new one is made on unpickling
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def invalidate(self):
+        """Drop the index. It is fetched again on the next lookup."""
+        with self._lock:
+            self._loaded = False
+
+    def allow_update(self):
+        """Allow the next lookup miss to refresh the index with a ``newer_than`` delta"""
+        with self._lock:
+            self._updated = False
+
+    @property
+    def loaded(self):
+        """``True`` if the index holds a fetched set of incidents"""
+        return self._loaded
+
+    def load(self, incidents):
+        """Replace the contents of the index with a freshly fetched list. The list is
+            as current as a ``newer_than`` delta would be, so a lookup miss right after
+            a load doesn't fetch again until :meth:`allow_update` is called
+
+        :param incidents: List of unacknowledged :class:`Incident <Incident>` objects
+        """
+        with self._lock:
+            self._by_id = {}
+            self._add(incidents)
+            self._loaded = True
+            self._updated = True
+
+    def refresh(self):
+        """Fetch all unacknowledged incidents and rebuild the index"""
+        with self._lock:
+            fetch_time = datetime.datetime.now(datetime.timezone.utc)
+            self.load(self.console.incidents.unacknowledged())
+            self._last_fetch = fetch_time
+
+    def update(self):
+        """Add unacknowledged incidents created since the index was last fetched.
+            Incidents acknowledged in the meantime are only dropped by a full :meth:`refresh`.
+        """
+        with self._lock:
+            if not self._loaded or self._last_fetch is None:
+                return self.refresh()
+            fetch_time = datetime.datetime.now(datetime.timezone.utc)
+            newer_than = self._last_fetch.strftime('%Y-%m-%d-%H:%M:%S')
+            self._add(self.console.incidents.unacknowledged(newer_than=newer_than))
+            self._last_fetch = fetch_time
+            self._updated = True
+
+    def resolve(self, incident_ids, node_id=None):
+        """Look up several incidents by id. If the index wasn't freshly fetched,
+            a miss refreshes it once with a ``newer_than`` delta.
+
+        :param incident_ids: List of incident ids
+        :param node_id: Node id of the single device the incidents belong to. If the index
+            isn't loaded, only that node's incidents are fetched and the index is left as is
+        :return: List of Incident objects found, in the order given
+        """
+        if not incident_ids:
+            return list()
+        if node_id is not None and not self._loaded:
+            incidents = dict((incident.id, incident)
+                             for incident in self.console.incidents.unacknowledged(node_id=node_id))
+            return [incidents[i] for i in incident_ids if i in incidents]
+        with self._lock:
+            if not self._loaded:
+                self.refresh()
+            if not self._updated and any(i not in self._by_id for i in incident_ids):
+                self.update()
+            return [self._by_id[i] for i in incident_ids if i in self._by_id]
+
+    def discard(self, incident_ids):
+        """Drop incidents that are no longer unacknowledged, e.g. after acknowledging them
+
+        :param incident_ids: Iterable of incident ids
+        """
+        with self._lock:
+            for incident_id in incident_ids:
+                self._by_id.pop(incident_id, None)
+
+    def __contains__(self, incident_id):
+        return incident_id in self._by_id
+
+    def _add(self, incidents):
+        for incident in incidents:
+            self._by_id[incident.id] = incident
+
+
+TIMESTAMP_FIELDS = frozenset(['created_std', 'updated_std'])
+
 
 class Incident(CanaryToolsBase):
+    _fields = frozenset(['console', 'id', 'description', 'summary', 'logtype', 'events',
+                         'acknowledged', 'dst_host', 'src_host', 'node_id', 'dst_port',
+                         'src_port', 'created_std', 'updated_std', 'flock_id', 'source'])
+
     def __init__(self, console, data):
         """Initialize Incident Object
 
@@ -203,9 +491,12 @@ class Incident(CanaryToolsBase):
             - **description (str)** -- The event description of the incident
             - **flock_id (str)** -- The id of the flock this incident belongs to
             - **acknowledged (bool)** -- Has the incident been acknowledged?
-            - **events (list)** -- List of events
+            - **events (list)** -- List of :class:`Event <Event>` objects, built on first access. Raw JSON
+              dicts if the Console was created with ``raw_events=True``
             - **logtype (str)** -- Log type
             - **summary (str)** -- The event description of the incident
+            - **source (str)** -- Name of the console the incident came from, set by
+              :class:`IncidentAggregator <IncidentAggregator>`
 
         **Subclasses:**
             List of classes which extend this base class.
@@ -227,17 +518,12 @@ class Incident(CanaryToolsBase):
             to Event objects.
         """
         # Set only specified fields as attributes
-        if key not in ['console', 'id', 'description', 'summary', 'logtype', 'events', \
-                       'acknowledged', 'dst_host', 'src_host', 'node_id', 'dst_port', \
-                       'src_port', 'created_std', 'updated_std', 'flock_id']:
+        if key not in self._fields:
             return
 
-        # if the key is events parse list of events parse events
+        # keep the raw events, Event objects are only built when accessed
         if 'events' == key:
-            events = list()
-            for event in value:
-                events.append(Event.parse(self.console, event))
-            value = events
+            value = EventList(self.console, value, raw=getattr(self.console, 'raw_events', False))
 
         # flatten description key
         if 'description' == key and isinstance(value, dict):
@@ -247,14 +533,13 @@ class Incident(CanaryToolsBase):
             return
 
         # update string bool values
-        if key in ['acknowledged']:
+        if 'acknowledged' == key:
             value = value == 'True'
 
-        if key in set(('created_std', 'updated_std')):
+        if key in TIMESTAMP_FIELDS:
             try:
-                # time format string defined in standardise_datetime on the Console
-                value = datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S %Z%z")
-            except ValueError:
+                value = parse_timestamp(value)
+            except (ValueError, OverflowError):
                 # leave it as a string
                 pass
 
@@ -281,7 +566,7 @@ class Incident(CanaryToolsBase):
         params = {'incident': self.id}
         r = self.console.post('incident/unacknowledge', params)
 
-        self.refresh()
+        self._mutated({'acknowledged': 'False'}, ['updated_std'])
 
         return r
 
@@ -300,7 +585,7 @@ class Incident(CanaryToolsBase):
         params = {'incident': self.id}
         r = self.console.post('incident/acknowledge', params)
 
-        self.refresh()
+        self._mutated({'acknowledged': 'True'}, ['updated_std'])
 
         return r
 
@@ -336,7 +621,7 @@ class Incident(CanaryToolsBase):
         incidents = Incidents(self.console)
         new_incident = incidents.get_incident(incident_id=self.id)
 
-        self.__dict__.update(new_incident.__dict__)
+        self._update(new_incident)
 
     def to_dict(self):
         """Convert incident to a dictionary format
@@ -344,22 +629,66 @@ class Incident(CanaryToolsBase):
         :return: Dictionary value of incident
         :rtype:  <type 'dict'>
         """
-        incident_dict = deepcopy(self.__dict__)
-        if 'console' in incident_dict.keys():
-            incident_dict.pop('console')
-
-        events_list = []
-        for event in incident_dict['events']:
-            if type(event) != dict:
-                event_dict = event.to_dict()
-                events_list.append(event_dict)
+        attributes = self._attributes()
+        incident_dict = dict((key, value) for key, value in attributes.items()
+                             if key not in ['console', 'events'])
+        incident_dict = deepcopy(incident_dict)
 
-        if events_list != []:
-            incident_dict['events'] = events_list
+        if 'events' in attributes:
+            incident_dict['events'] = [deepcopy(event) if type(event) == dict else event.to_dict()
+                                       for event in self.events]
 
         return incident_dict
 
+
+class EventList(Sequence):
+    __slots__ = ('console', 'raw', '_data', '_events')
+
+    def __init__(self, console, events, raw=False):
+        """List of an Incident's events. Keeps the raw JSON data and only
+            builds an :class:`Event <Event>` the first time it is accessed.
+
+        :param console: The Console from which API calls are made
+        :param events: List of JSON event data
+        :param raw: Return the raw JSON data instead of Event objects
+        """
+        self.console = console
+        self.raw = raw
+        self._data = list(events)
+        self._events = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self.raw:
+            return self._data[index]
+        if self._events is None:
+            self._events = [None] * len(self._data)
+        event = self._events[index]
+        if event is None:
+            event = Event.parse(self.console, self._data[index])
+            self._events[index] = event
+        return event
+
+    def __eq__(self, other):
+        if isinstance(other, (list, EventList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return repr(list(self))
+
 class Event(CanaryToolsBase):
+    _fields = frozenset(['console', 'timestamp', 'type', 'src_host', 'src_port', 'dst_host', 'dst_port',
+                         'username', 'password', 'ports_scanned'])
+
     def __init__(self, console, data):
         """An event contains all the details relating to a incident occurence.
 
@@ -383,15 +712,12 @@ class Event(CanaryToolsBase):
                 self.ports_scanned[key] = value
                 return
 
-        if key in ['timestamp']:
+        if 'timestamp' == key:
             return
 
         if 'timestamp_std' == key:
             key = key[:-4]
-            if value:
-                value = parse(value)
-            else:
-                value = None
+            value = parse_timestamp(value)
 
         super(Event, self).__setattr__(key.lower(), value)
 
@@ -400,7 +726,7 @@ class Event(CanaryToolsBase):
         """
         time = None
         event_info = ""
-        for key, value in vars(self).items():
+        for key, value in self._attributes().items():
             # exclude these from the string
             if 'console' == key:
                 continue
@@ -440,8 +766,7 @@ class Event(CanaryToolsBase):
         :return: Dictionary value of event
         :rtype:  <type 'dict'>
         """
-        event_dict = deepcopy(self.__dict__)
-        event_dict.pop('console')
+        event_dict = deepcopy(dict((key, value) for key, value in self._attributes().items() if key != 'console'))
 
         # It's likely by mistake that we expliclitly include and reformat timestamp field here. This method otherwise
         # transparently passes on the Event dict. This breaks on the ConsolidatedNetworkPortscan event, whose details
@@ -26,3 +26,33 @@ class Result(CanaryToolsBase):
                     key=str(key), value=str(value))
 
         return "[Result] {info}".format(info=info)
+
+
+class BatchResult(object):
+    def __init__(self, item, result=None, error=None):
+        """Outcome of a single item in a batch operation
+
+        :param item: The input item
+        :param result: The value returned for the item
+        :param error: The exception raised for the item, if any
+
+        **Attributes:**
+            - **item** -- The input item
+            - **result** -- The value returned for the item. ``None`` if it failed
+            - **error (Exception)** -- The exception raised for the item. ``None`` if it succeeded
+        """
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        """``True`` if the item succeeded"""
+        return self.error is None
+
+    def __str__(self):
+        """Helper method
+        """
+        if self.ok:
+            return "[BatchResult] item: {item} result: {result}".format(item=self.item, result=self.result)
+        return "[BatchResult] item: {item} error: {error!r}".format(item=self.item, error=self.error)
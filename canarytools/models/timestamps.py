@@ -0,0 +1,60 @@
+import datetime
+import re
+
+from dateutil.parser import parse
+
+# format of the *_std timestamps, see standardise_datetime on the Console: "%Y-%m-%d %H:%M:%S %Z%z"
+TIMESTAMP_RE = re.compile(r'^(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d) ?([A-Za-z]*)([+-])(\d\d):?(\d\d)$')
+
+_timezones = {}
+
+
+def get_timezone(name, sign, hours, minutes):
+    """Get a cached fixed offset timezone
+
+    :param name: Timezone abbreviation, e.g. 'UTC'
+    :param sign: '+' or '-'
+    :param hours: Offset hours
+    :param minutes: Offset minutes
+    :return: A ``datetime.timezone`` object
+    """
+    key = (name, sign, hours, minutes)
+    tz = _timezones.get(key)
+    if tz is None:
+        offset = datetime.timedelta(hours=int(hours), minutes=int(minutes))
+        if sign == '-':
+            offset = -offset
+        tz = datetime.timezone(offset, name) if name else datetime.timezone(offset)
+        _timezones[key] = tz
+    return tz
+
+
+def parse_timestamp(value):
+    """Decode a timestamp returned by the console. The console's fixed format is
+        decoded directly and anything else falls back to ``dateutil``.
+
+    :param value: Timestamp string, e.g. '2019-12-25 12:00:00 UTC+0000'
+    :return: Timezone aware datetime, or ``None`` for an empty value
+    :rtype: datetime.datetime
+
+    :except ValueError: The value isn't a recognisable timestamp
+    """
+    if not value:
+        return None
+    match = TIMESTAMP_RE.match(value)
+    if match:
+        year, month, day, hour, minute, second, name, sign, hours, minutes = match.groups()
+        return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                                 tzinfo=get_timezone(name, sign, hours, minutes))
+    return parse(value)
+
+
+def format_newer_than(value):
+    """Format a datetime for the ``newer_than`` parameter of the incidents endpoints
+
+    :param value: A datetime. Naive datetimes are taken to be UTC
+    :return: UTC date string like '2019-12-25-12:00:00'
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc)
+    return value.strftime('%Y-%m-%d-%H:%M:%S')
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .console import Console
+from .models.result import BatchResult
+
+
+class ConsolePool(object):
+    def __init__(self, consoles=None, max_workers=16):
+        """A set of :class:`Console <Console>` objects, usually one per customer console,
+            that a query can be fanned out to in parallel
+
+        :param consoles: Consoles to manage, either a dictionary of name to Console or a list
+            of Consoles which are then named by their domain
+        :param max_workers: Maximum number of consoles queried at once
+
+        Usage::
+
+            >>> import canarytools
+            >>> pool = canarytools.ConsolePool([canarytools.Console(domain, api_key) for domain, api_key in keys])
+            >>> incidents = pool.merge(lambda console: console.incidents.unacknowledged())
+        """
+        self.max_workers = max_workers
+        self.consoles = OrderedDict()
+        if isinstance(consoles, dict):
+            for name, console in consoles.items():
+                self.add(console, name)
+        else:
+            for console in consoles or []:
+                self.add(console)
+
+    @classmethod
+    def from_keys(cls, keys, max_workers=16, **kwargs):
+        """Create a pool from API keys
+
+        :param keys: Dictionary of console domain to API key
+        :param max_workers: Maximum number of consoles queried at once
+        :param kwargs: Arguments passed on to each :class:`Console <Console>`
+        :return: ConsolePool object
+        :rtype: :class:`ConsolePool <ConsolePool>`
+        """
+        return cls(OrderedDict((domain, Console(domain, api_key, **kwargs)) for domain, api_key in keys.items()),
+                   max_workers=max_workers)
+
+    def add(self, console, name=None):
+        """Add a console to the pool
+
+        :param console: The Console to add
+        :param name: Name of the console. Defaults to its domain
+        """
+        self.consoles[name or console.domain] = console
+
+    def remove(self, name):
+        """Remove a console from the pool
+
+        :param name: Name of the console
+        """
+        del self.consoles[name]
+
+    def __getitem__(self, name):
+        return self.consoles[name]
+
+    def __iter__(self):
+        return iter(self.consoles.values())
+
+    def __len__(self):
+        return len(self.consoles)
+
+    def map(self, func, max_workers=None):
+        """Call a function with every console concurrently. An exception raised for
+            one console is collected and does not stop the others.
+
+        :param func: Function taking a single Console, e.g. ``lambda console: console.devices.live()``
+        :param max_workers: Maximum number of consoles queried at once. Defaults to the
+            ``max_workers`` the pool was created with
+        :return: List of results in pool order, the ``item`` of each result being the console's name
+        :rtype: List of :class:`BatchResult <BatchResult>` objects
+        """
+        if not self.consoles:
+            return list()
+
+        def call(name):
+            try:
+                return BatchResult(name, result=func(self.consoles[name]))
+            except Exception as e:
+                return BatchResult(name, error=e)
+
+        workers = min(max_workers or self.max_workers, len(self.consoles))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(call, list(self.consoles)))
+
+    def merge(self, func, key=None, reverse=False, ignore_errors=False, max_workers=None):
+        """Call a function returning a list with every console concurrently and merge the lists
+
+        :param func: Function taking a single Console and returning a list,
+            e.g. ``lambda console: console.incidents.unacknowledged()``
+        :param key: Sort the merged list by this function, e.g. ``lambda incident: incident.created_std``.
+            By default lists are concatenated in pool order
+        :param reverse: Sort in descending order
+        :param ignore_errors: Leave out consoles whose call failed. Otherwise the first error is
+            raised once every console has been queried
+        :param max_workers: Maximum number of consoles queried at once
+        :return: The merged list
+
+        :except Exception: The error raised by a failed call, unless ``ignore_errors`` is set
+        """
+        merged = list()
+        for result in self.map(func, max_workers=max_workers):
+            if result.ok:
+                merged.extend(result.result)
+            elif not ignore_errors:
+                raise result.error
+        if key is not None:
+            merged.sort(key=key, reverse=reverse)
+        return merged
@@ -0,0 +1,147 @@
+import threading
+import time
+
+from .cache import endpoint_family
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        """Token bucket allowing ``rate`` requests per second on average, with bursts
+            of up to ``burst`` requests. Thread safe.
+
+        :param rate: Number of requests per second
+        :param burst: Size of the bucket. Defaults to ``rate`` (one second worth of requests)
+        :param clock: Monotonic clock returning seconds
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self.clock = clock
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock can't be pickled, a new one is made on unpickling
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens from the bucket, going into debt if it is empty so that
+            waiting callers are served in order
+
+        :param tokens: Number of tokens to take
+        :return: Number of seconds to wait before the tokens are available
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+    def __init__(self, rate=None, burst=None, families=None, sleep=time.sleep):
+        """Client side rate limiter for Console requests. A single limiter can be shared by
+            any number of threads and :class:`Console <Console>` objects talking to the
+            same console, so that together they stay under its API limits.
+
+        :param rate: Requests per second across all endpoints. ``None`` for no overall limit
+        :param burst: Number of requests allowed in a burst. Defaults to ``rate``
+        :param families: Extra limits per endpoint family, keyed by family name (``'canarytoken'``,
+            ``'incident'``, ``'device'``, ...) with either a rate or a ``(rate, burst)`` tuple as value.
+            A request must satisfy both its family limit and the overall limit
+        :param sleep: Function used to wait
+
+        **Attributes:**
+            - **requests (int)** -- Number of requests that went through the limiter
+            - **waits (int)** -- Number of requests that had to wait
+            - **total_wait (float)** -- Total number of seconds spent waiting
+            - **max_wait (float)** -- Longest single wait in seconds
+
+        Usage::
+
+            >>> import canarytools
+            >>> limiter = canarytools.RateLimiter(rate=10, families={'canarytoken': (2, 5)})
+            >>> console = canarytools.Console(rate_limit=limiter)
+        """
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.families = {}
+        for family, limit in (families or {}).items():
+            if not isinstance(limit, (tuple, list)):
+                limit = (limit,)
+            self.families[family] = TokenBucket(*limit)
+        self.sleep = sleep
+        self.requests = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to ``url`` is allowed
+
+        :param url: Url of the API endpoint
+        :return: Number of seconds waited
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def reserve(self, url):
+        """Reserve a request to ``url`` without waiting, e.g. to wait with ``asyncio.sleep()`` instead
+
+        :param url: Url of the API endpoint
+        :return: Number of seconds to wait before sending the request
+        """
+        delay = 0.0
+        family = self.families.get(endpoint_family(url))
+        if family is not None:
+            delay = family.reserve()
+        if self.bucket is not None:
+            delay = max(delay, self.bucket.reserve())
+
+        with self._lock:
+            self.requests += 1
+            if delay > 0:
+                self.waits += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+        return delay
+
+    def stats(self):
+        """Wait time counters
+
+        :return: Dictionary with requests, waits, total_wait, max_wait and mean_wait
+        """
+        with self._lock:
+            return {'requests': self.requests, 'waits': self.waits, 'total_wait': self.total_wait,
+                    'max_wait': self.max_wait,
+                    'mean_wait': self.total_wait / self.waits if self.waits else 0.0}
+
+    def reset_stats(self):
+        """Reset the wait time counters"""
+        with self._lock:
+            self.requests = 0
+            self.waits = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
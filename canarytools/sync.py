@@ -0,0 +1,171 @@
+import datetime
+import sqlite3
+import threading
+
+from .models.timestamps import format_newer_than, parse_timestamp
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_seen (
+    id TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+'''
+
+
+def incident_version(incident):
+    """Time an incident was last changed: its ``updated_std``, or ``created_std`` if it was never updated
+
+    :return: Timezone aware datetime, or ``None`` if the incident has no usable timestamp
+    """
+    for key in ('updated_std', 'created_std'):
+        value = getattr(incident, key, None)
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            return value.astimezone(datetime.timezone.utc)
+    return None
+
+
+class IncidentSync(object):
+    def __init__(self, console, path, newer_than=None, event_limit=None):
+        """Incremental sync of a console's incidents, e.g. for forwarding to a SIEM. Each run
+            returns only the incidents that are new or changed since the last run, across
+            restarts of the process.
+
+            A high-water mark and the versions of the incidents at the mark are kept in a
+            SQLite database. Each run asks the console for incidents ``newer_than`` the mark,
+            so the cost of a run follows the number of new incidents rather than the history.
+
+            Incidents are handed over oldest first and each one is committed to the database
+            once it has been handled, see :meth:`run`. Delivery is at-least-once, not exactly-once:
+            an incident is handed over again if the handler fails or the process stops between
+            handling it and committing it. A sink that must not see duplicates should deduplicate
+            on :meth:`delivery_key`.
+
+        :param console: The Console from which API calls are made
+        :param path: Path of the SQLite database, created if it doesn't exist
+        :param newer_than: Datetime to start from on the very first run. By default the first run
+            returns every incident
+        :param event_limit: Maximum number of events returned with each incident
+
+        Usage::
+
+            >>> import canarytools
+            >>> sync = canarytools.IncidentSync(console, '/var/lib/forwarder/incidents.db')
+            >>> sync.run(lambda incident: siem.send(incident.to_dict()))
+        """
+        self.console = console
+        self.path = path
+        self.event_limit = event_limit
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(SCHEMA)
+        if newer_than is not None and self.mark is None:
+            self._set_mark(newer_than)
+
+    @property
+    def mark(self):
+        """The high-water mark: the change time of the newest incident committed,
+            as a UTC datetime, or ``None`` before anything has been committed
+        """
+        row = self._db.execute("SELECT value FROM sync_state WHERE name = 'mark'").fetchone()
+        return parse_timestamp(row[0]) if row else None
+
+    def pending(self):
+        """Fetch the incidents that are new or changed since they were last committed
+
+        :return: Incidents ordered by the time they last changed, oldest first
+        :rtype: List of :class:`Incident <Incident>` objects
+        """
+        mark = self.mark
+        newer_than = format_newer_than(mark) if mark is not None else None
+        incidents = self.console.incidents.all(newer_than=newer_than, event_limit=self.event_limit)
+
+        with self._lock:
+            seen = dict(self._db.execute('SELECT id, version FROM sync_seen'))
+        pending = [incident for incident in incidents
+                   if seen.get(incident.id) != (self._version_key(incident) or '')]
+        pending.sort(key=lambda incident: self._version_key(incident) or '')
+        return pending
+
+    def commit(self, incident):
+        """Record an incident as handled. Advances the high-water mark to the incident's change time.
+
+        :param incident: The handled :class:`Incident <Incident>`
+        """
+        version = incident_version(incident)
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO sync_seen (id, version) VALUES (?, ?)',
+                             (incident.id, self._version_key(incident) or ''))
+            if version is not None:
+                mark = self.mark
+                if mark is None or version > mark:
+                    self._db.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES ('mark', ?)",
+                                     (version.isoformat(),))
+                    # incidents older than the mark aren't returned by the console any more
+                    self._db.execute("DELETE FROM sync_seen WHERE version != '' AND version < ?",
+                                     (version.isoformat(),))
+
+    def run(self, handler, commit_first=False):
+        """Hand every new or changed incident to a handler, oldest first.
+
+            By default each incident is committed as soon as the handler returns, which makes
+            delivery at-least-once. If the handler raises, the run stops and the incident is
+            handed over again on the next run, as it is if the process stops before the commit.
+            Deduplicate on :meth:`delivery_key` at the sink for exactly-once processing.
+
+            With ``commit_first`` each incident is committed before it is handed over, which
+            makes delivery at-most-once. An incident whose handler raises is not handed over again.
+
+        :param handler: Function taking a single :class:`Incident <Incident>`
+        :param commit_first: Commit each incident before handing it over rather than after
+        :return: Number of incidents handled
+        :rtype: int
+        """
+        handled = 0
+        for incident in self.pending():
+            if commit_first:
+                self.commit(incident)
+                handler(incident)
+            else:
+                handler(incident)
+                self.commit(incident)
+            handled += 1
+        return handled
+
+    @classmethod
+    def delivery_key(cls, incident):
+        """Key identifying one version of an incident, the same every time that version is
+            handed over. A sink can store it to drop the repeats of at-least-once delivery.
+
+        :param incident: An :class:`Incident <Incident>`
+        :return: The incident id and change time, e.g. 'incident:sshlogin:1:2020-01-01T10:00:00+00:00'
+        """
+        return '{0}:{1}'.format(incident.id, cls._version_key(incident) or '')
+
+    def reset(self):
+        """Forget the high-water mark and all seen incidents. The next run returns every incident"""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM sync_seen')
+            self._db.execute('DELETE FROM sync_state')
+
+    def close(self):
+        """Close the database"""
+        self._db.close()
+
+    def _set_mark(self, value):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES ('mark', ?)",
+                             (value.astimezone(datetime.timezone.utc).isoformat(),))
+
+    @staticmethod
+    def _version_key(incident):
+        version = incident_version(incident)
+        return version.isoformat() if version is not None else None
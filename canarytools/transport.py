@@ -0,0 +1,137 @@
+import email.utils
+import random
+import time
+
+import requests
+
+
+class RetryPolicy(object):
+    def __init__(self, retries=3, backoff_factor=0.5, max_backoff=30, jitter=True,
+                 status_forcelist=(429, 500, 502, 503, 504), retry_methods=('GET',), retry_endpoints=()):
+        """Rules for retrying failed requests. Only idempotent requests are retried:
+            GETs by default, and other requests only to endpoints that are opted in.
+
+        :param retries: Maximum number of retries of a request. ``0`` disables retrying
+        :param backoff_factor: Base delay in seconds. The delay before retry ``n`` is
+            ``backoff_factor * 2 ** n``, capped at ``max_backoff``
+        :param max_backoff: Maximum delay in seconds between attempts, also applied to ``Retry-After``
+        :param jitter: Randomise each delay between half and all of its value
+        :param status_forcelist: HTTP status codes that are retried
+        :param retry_methods: HTTP methods that are always retried
+        :param retry_endpoints: Endpoints retried whatever the method, e.g. ``['canarytoken/enable']``
+
+        Usage::
+
+            >>> import canarytools
+            >>> retry = canarytools.RetryPolicy(retries=5, retry_endpoints=['canarytoken/enable', 'canarytoken/disable'])
+            >>> console = canarytools.Console(retry=retry)
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.retry_endpoints = frozenset(retry_endpoints)
+
+    def is_retryable(self, method, endpoint):
+        """Can a request be safely retried?
+
+        :param method: HTTP method
+        :param endpoint: Url of the API endpoint, e.g. 'canarytoken/enable'
+        """
+        return method.upper() in self.retry_methods or endpoint in self.retry_endpoints
+
+    def backoff(self, attempt, retry_after=None):
+        """Delay before the next attempt
+
+        :param attempt: Number of the failed attempt, starting at 0
+        :param retry_after: Value of the response's ``Retry-After`` header, if any
+        :return: Delay in seconds
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_factor * (2 ** attempt)
+            if self.jitter:
+                delay = random.uniform(delay / 2, delay)
+        return max(0, min(delay, self.max_backoff))
+
+
+def parse_retry_after(value):
+    """Parse a ``Retry-After`` header, given either in seconds or as an HTTP date
+
+    :param value: Header value
+    :return: Delay in seconds or ``None``
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return date.timestamp() - time.time()
+
+
+class Transport(object):
+    def __init__(self, session=None, retry=None, sleep=time.sleep):
+        """Sends the Console's HTTP requests, retrying failures according to a
+            :class:`RetryPolicy <RetryPolicy>`. Subclass and override :meth:`send`
+            to plug in a different HTTP client.
+
+        :param session: ``requests.Session`` used to send requests. A new session is created if not given
+        :param retry: The :class:`RetryPolicy <RetryPolicy>` to apply. Defaults to ``RetryPolicy()``
+        :param sleep: Function used to wait between attempts
+        """
+        self.session = session if session is not None else requests.session()
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.sleep = sleep
+
+    def request(self, method, url, endpoint=None, rate_limit=None, **kwargs):
+        """Send a request, retrying transient failures
+
+        :param method: HTTP method
+        :param url: Full url of the request
+        :param endpoint: Url of the API endpoint, used to decide whether the request may be retried
+        :param rate_limit: A :class:`RateLimiter <RateLimiter>` acquired for ``endpoint`` before every
+            attempt, so that retries count against the limits too
+        :param kwargs: Arguments passed on to :meth:`send`
+        :return: The response
+        :rtype: requests.Response
+        """
+        retryable = self.retry.is_retryable(method, endpoint)
+        attempt = 0
+        while True:
+            if rate_limit is not None:
+                rate_limit.acquire(endpoint)
+            try:
+                resp = self.send(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if not retryable or attempt >= self.retry.retries:
+                    raise
+                self.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                continue
+
+            if retryable and resp.status_code in self.retry.status_forcelist and attempt < self.retry.retries:
+                delay = self.retry.backoff(attempt, resp.headers.get('Retry-After'))
+                resp.close()
+                self.sleep(delay)
+                attempt += 1
+                continue
+            return resp
+
+    def send(self, method, url, **kwargs):
+        """Send a single request
+
+        :param method: HTTP method
+        :param url: Full url of the request
+        :param kwargs: Arguments passed on to ``requests.Session.request``
+        :return: The response
+        """
+        return self.session.request(method, url, **kwargs)
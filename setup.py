@@ -44,6 +44,11 @@ setup(
 
     install_requires=['requests>=2.10.0', 'python-dateutil>=2.1', 'pytz>=2013b'],
 
+    extras_require={
+        'async': ['aiohttp>=3.0'],
+        'stream': ['ijson>=3.1'],
+    },
+
     package_data={
         '': ['LICENSE.txt'],
     },
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import canarytools
+
+
+class ConsoleHandler(BaseHTTPRequestHandler):
+    """Stands in for a console answering ``ping`` with ``503`` the first ``failures`` times,
+        and taking ``delay`` seconds over each response
+    """
+    failures = 0
+    delay = 0
+    requests = 0
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests += 1
+        time.sleep(cls.delay)
+        if cls.failures > 0:
+            cls.failures -= 1
+            body = b'Service Unavailable'
+            self.send_response(503)
+        else:
+            body = json.dumps({'result': 'success'}).encode('utf-8')
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class AsyncConsoleRequestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), ConsoleHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:{0}/api/v1/'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ConsoleHandler.failures = 0
+        ConsoleHandler.delay = 0
+        ConsoleHandler.requests = 0
+
+    def ping(self, **kwargs):
+        async def ping():
+            async with canarytools.AsyncConsole('example', 'API_KEY', base_url=self.base_url, **kwargs) as console:
+                return await console.ping()
+        return asyncio.run(ping())
+
+    def test_retries_count_against_a_shared_limiter(self):
+        ConsoleHandler.failures = 2
+        limiter = canarytools.RateLimiter(rate=100)
+        retry = canarytools.RetryPolicy(backoff_factor=0)
+        self.assertTrue(self.ping(retry=retry, rate_limit=limiter))
+        self.assertEqual(ConsoleHandler.requests, 3)
+        self.assertEqual(limiter.stats()['requests'], 3)
+
+    def test_timeout_raises_connection_error(self):
+        ConsoleHandler.delay = 0.5
+        retry = canarytools.RetryPolicy(retries=0)
+        with self.assertRaises(canarytools.ConnectionError):
+            self.ping(retry=retry, timeout=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
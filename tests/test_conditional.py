@@ -0,0 +1,101 @@
+import json
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import canarytools
+
+
+class ConsoleHandler(BaseHTTPRequestHandler):
+    """Stands in for a console, answering ``devices/all`` with an ``ETag`` and
+        ``304 Not Modified`` when the client already holds the current version
+    """
+    etag = '"1"'
+    devices = []
+    requests = []
+
+    def do_GET(self):
+        cls = type(self)
+        if self.headers.get('If-None-Match') == cls.etag:
+            body = b''
+            self.send_response(304)
+        else:
+            body = json.dumps({'result': 'success', 'devices': cls.devices}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        # recorded before the response goes out, so the client can't see it before the record
+        cls.requests.append((self.path, self.headers.get('If-None-Match'), len(body)))
+        self.send_header('ETag', cls.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), ConsoleHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:{0}/api/v1/'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ConsoleHandler.etag = '"1"'
+        ConsoleHandler.devices = [{'id': '0000000000231c23', 'name': 'web01', 'live': True}]
+        ConsoleHandler.requests = []
+        self.console = canarytools.Console('example', 'API_KEY', base_url=self.base_url, conditional=True)
+
+    def test_unchanged_poll_skips_transfer_and_parsing(self):
+        parsed = []
+
+        def parser(data):
+            parsed.append(data)
+            return self.console.devices.parse(data)
+
+        first = self.console.get('devices/all', {}, parser)
+        second = self.console.get('devices/all', {}, parser)
+
+        self.assertIs(second, first)
+        self.assertEqual(len(parsed), 1)
+        self.assertEqual(self.console.validators.revalidated, 1)
+        (_, sent_first, size_first), (_, sent_second, size_second) = ConsoleHandler.requests
+        self.assertIsNone(sent_first)
+        self.assertGreater(size_first, 0)
+        self.assertEqual(sent_second, '"1"')
+        self.assertEqual(size_second, 0)
+
+    def test_devices_all_reuses_objects_until_changed(self):
+        first = self.console.devices.all()
+        self.assertIs(self.console.devices.all(), first)
+        self.assertEqual(first[0].name, 'web01')
+
+        ConsoleHandler.etag = '"2"'
+        ConsoleHandler.devices = ConsoleHandler.devices + [{'id': '0000000000231c24', 'name': 'web02', 'live': True}]
+        changed = self.console.devices.all()
+        self.assertIsNot(changed, first)
+        self.assertEqual([device.name for device in changed], ['web01', 'web02'])
+        self.assertEqual([size > 0 for _, _, size in ConsoleHandler.requests], [True, False, True])
+
+    def test_api_key_sent_with_every_poll(self):
+        self.console.devices.all()
+        self.console.devices.all()
+        self.assertEqual(len(ConsoleHandler.requests), 2)
+        for path, _, _ in ConsoleHandler.requests:
+            self.assertIn('auth_token=API_KEY', path)
+
+
+if __name__ == '__main__':
+    unittest.main()
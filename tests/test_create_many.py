@@ -0,0 +1,104 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import canarytools
+from canarytools.exceptions import CanaryTokenError
+
+MEMO = 'Payroll on host-42'
+SPEC = {'memo': MEMO, 'kind': canarytools.CanaryTokenKinds.DOC_MSWORD}
+
+
+class StubResponse(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self.text = json.dumps(data)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StubSession(object):
+    """Stands in for a console holding ``tokens``. Creates are turned down while ``failing`` is set"""
+
+    def __init__(self, tokens=()):
+        self.tokens = list(tokens)
+        self.failing = False
+        self.creates = 0
+
+    def request(self, method, url, **kwargs):
+        if url.endswith('canarytokens/fetch'):
+            return StubResponse({'result': 'success', 'tokens': self.tokens})
+        self.creates += 1
+        if self.failing:
+            return StubResponse({'result': 'error', 'message': 'Could not save Canarydrop'})
+        token = {'canarytoken': 'new{0}'.format(self.creates), 'memo': kwargs['data']['memo'],
+                 'kind': kwargs['data']['kind'], 'created': str(time.time())}
+        self.tokens.append(token)
+        return StubResponse({'result': 'success', 'canarytoken': token})
+
+
+class CreateManyResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.manifest = os.path.join(self.directory, 'rollout.jsonl')
+        # an unrelated token created long before the rollout, with the same memo and kind
+        self.older = {'canarytoken': 'older', 'memo': MEMO, 'kind': SPEC['kind'], 'created': '1577872800.0'}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_specs(self, session):
+        console = canarytools.Console('example', 'API_KEY', session=session)
+        return list(console.tokens.create_many([SPEC], manifest=self.manifest))
+
+    def crash_mid_create(self):
+        """Leave the manifest as a run that stopped with the create in flight would"""
+        with open(self.manifest, 'w') as f:
+            f.write(json.dumps({'key': canarytools.models.canarytokens.spec_key(SPEC, {}), 'state': 'pending',
+                                'memo': MEMO, 'kind': SPEC['kind'], 'sent': time.time()}) + '\n')
+
+    def test_interrupted_create_is_matched_to_the_token_it_created(self):
+        self.crash_mid_create()
+        created = {'canarytoken': 'created', 'memo': MEMO, 'kind': SPEC['kind'], 'created': str(time.time())}
+        session = StubSession([self.older, created])
+
+        result, = self.run_specs(session)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.result.canarytoken, 'created')
+        self.assertEqual(session.creates, 0)
+
+    def test_interrupted_create_ignores_older_tokens_with_the_same_memo(self):
+        self.crash_mid_create()
+        session = StubSession([self.older])
+
+        result, = self.run_specs(session)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.result.canarytoken, 'new1')
+        self.assertEqual(session.creates, 1)
+
+    def test_failed_create_is_sent_again(self):
+        session = StubSession([self.older])
+        session.failing = True
+        result, = self.run_specs(session)
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, CanaryTokenError)
+
+        session.failing = False
+        result, = self.run_specs(session)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.result.canarytoken, 'new2')
+
+        # and the token isn't created a third time
+        result, = self.run_specs(session)
+        self.assertEqual(result.result.canarytoken, 'new2')
+        self.assertEqual(session.creates, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import unittest
+
+import canarytools
+
+
+def device(node_id, incident_ids):
+    return {'id': node_id, 'name': 'canary-{0}'.format(node_id), 'device_live': 'True',
+            'unacknowleged_incidents': [{'key': incident_id} for incident_id in incident_ids]}
+
+
+def incident(incident_id, node_id):
+    return {'id': incident_id, 'summary': 'SSH Login Attempt', 'description': 'SSH Login Attempt',
+            'node_id': node_id, 'acknowledged': 'False', 'events': [],
+            'created_std': '2020-01-01 10:00:00 UTC+0000'}
+
+
+class StubResponse(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self.text = json.dumps(data)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StubSession(object):
+    """Stands in for a console with two devices, each with one unacknowledged incident"""
+
+    def __init__(self):
+        self.devices = [device('node1', ['incident:1']), device('node2', ['incident:2'])]
+        self.incidents = [incident('incident:1', 'node1'), incident('incident:2', 'node2')]
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        endpoint = url.split('/api/v1/')[1]
+        params = kwargs.get('params') or {}
+        self.calls.append((endpoint, params.get('node_id')))
+        if endpoint == 'devices/all':
+            return StubResponse({'result': 'success', 'devices': self.devices})
+        if endpoint == 'device/getinfo':
+            return StubResponse({'result': 'success', 'device': [d for d in self.devices
+                                                                 if d['id'] == params['node_id']][0]})
+        if endpoint == 'incidents/unacknowledged':
+            return StubResponse({'result': 'success', 'incidents': [
+                i for i in self.incidents if params.get('node_id') in (None, i['node_id'])]})
+        raise AssertionError('unexpected request to {0}'.format(endpoint))
+
+
+class DeviceIncidentsTest(unittest.TestCase):
+    def setUp(self):
+        self.session = StubSession()
+        self.console = canarytools.Console('example', 'API_KEY', session=self.session)
+
+    def test_single_device_fetches_only_its_own_incidents(self):
+        device = self.console.devices.get_device('node1')
+        self.assertEqual([i.id for i in device.unacknowleged_incidents], ['incident:1'])
+        self.assertEqual(self.session.calls, [('device/getinfo', 'node1'), ('incidents/unacknowledged', 'node1')])
+        self.assertFalse(self.console.incident_index.loaded)
+
+    def test_listing_fetches_the_incidents_once(self):
+        devices = self.console.devices.all()
+        self.assertEqual([[i.id for i in d.unacknowleged_incidents] for d in devices],
+                         [['incident:1'], ['incident:2']])
+        self.assertEqual(self.session.calls, [('devices/all', None), ('incidents/unacknowledged', None)])
+
+        # the detail of a listed device resolves through the loaded index
+        devices[0].hydrate()
+        self.assertEqual(self.session.calls[-1], ('device/getinfo', 'node1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import pickle
+import unittest
+
+import canarytools
+from canarytools.models.incidents import IncidentFTPLogin
+
+INCIDENT = {'id': 'incident:ftplogin:1', 'summary': 'FTP Login Attempt', 'description': 'FTP Login Attempt',
+            'node_id': '0000000000231c23', 'logtype': '2000', 'events': [],
+            'created_std': '2020-01-01 10:00:00 UTC+0000'}
+
+
+class ModelVariantTest(unittest.TestCase):
+    def test_regular_objects_are_of_the_declared_class(self):
+        console = canarytools.Console('example', 'API_KEY')
+        incident = IncidentFTPLogin.parse(console, INCIDENT)
+        self.assertIs(type(incident), IncidentFTPLogin)
+
+        copy = pickle.loads(pickle.dumps(incident))
+        self.assertIs(type(copy), IncidentFTPLogin)
+        self.assertEqual(copy.to_dict(), incident.to_dict())
+
+    def test_compact_objects_keep_fields_in_slots_and_pickle(self):
+        console = canarytools.Console('example', 'API_KEY', compact=True)
+        incident = IncidentFTPLogin.parse(console, INCIDENT)
+        self.assertIsInstance(incident, IncidentFTPLogin)
+        self.assertEqual(incident.__dict__, {})
+
+        copy = pickle.loads(pickle.dumps(incident))
+        self.assertIs(type(copy), type(incident))
+        self.assertEqual(copy.to_dict(), incident.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
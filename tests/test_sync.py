@@ -0,0 +1,121 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import canarytools
+
+START = datetime.datetime(2020, 1, 1, 10, 0, tzinfo=datetime.timezone.utc)
+
+
+class StubIncident(object):
+    def __init__(self, incident_id, created, updated=None):
+        self.id = incident_id
+        self.created_std = created
+        if updated is not None:
+            self.updated_std = updated
+
+
+class StubIncidents(object):
+    """Stands in for a console's incidents endpoint, honouring ``newer_than`` to the second"""
+
+    def __init__(self):
+        self.incidents = []
+        self.newer_than = []
+
+    def all(self, newer_than=None, event_limit=None):
+        self.newer_than.append(newer_than)
+        since = datetime.datetime.strptime(newer_than, '%Y-%m-%d-%H:%M:%S').replace(
+            tzinfo=datetime.timezone.utc) if newer_than else None
+        return [incident for incident in self.incidents
+                if since is None or getattr(incident, 'updated_std', incident.created_std) >= since]
+
+
+class StubConsole(object):
+    def __init__(self):
+        self.incidents = StubIncidents()
+
+
+class IncidentSyncRestartTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'incidents.db')
+        self.console = StubConsole()
+        self.console.incidents.incidents = [
+            StubIncident('incident:1', START),
+            StubIncident('incident:2', START + datetime.timedelta(minutes=1)),
+            # created in the same second as the newest incident
+            StubIncident('incident:3', START + datetime.timedelta(minutes=1)),
+        ]
+        self.handled = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def restart(self):
+        """Run once with a fresh IncidentSync on the same database, as a restarted process would"""
+        sync = canarytools.IncidentSync(self.console, self.path)
+        try:
+            return sync.run(lambda incident: self.handled.append(incident.id))
+        finally:
+            sync.close()
+
+    def seen(self):
+        sync = canarytools.IncidentSync(self.console, self.path)
+        try:
+            return sync.mark, sorted(row[0] for row in sync._db.execute('SELECT id FROM sync_seen'))
+        finally:
+            sync.close()
+
+    def test_restart_hands_over_only_new_and_changed_incidents(self):
+        self.assertEqual(self.restart(), 3)
+        mark, seen = self.seen()
+        self.assertEqual(mark, START + datetime.timedelta(minutes=1))
+        # incidents older than the mark are pruned from the seen set
+        self.assertEqual(seen, ['incident:2', 'incident:3'])
+
+        self.assertEqual(self.restart(), 0)
+        self.assertEqual(self.console.incidents.newer_than[-1], '2020-01-01-10:01:00')
+
+        self.console.incidents.incidents[0].updated_std = START + datetime.timedelta(minutes=5)
+        self.assertEqual(self.restart(), 1)
+        self.assertEqual(self.handled, ['incident:1', 'incident:2', 'incident:3', 'incident:1'])
+        self.assertEqual(self.seen(), (START + datetime.timedelta(minutes=5), ['incident:1']))
+
+    def test_failed_handler_is_handed_the_incident_again(self):
+        def handler(incident):
+            if incident.id == 'incident:2':
+                raise IOError('sink unavailable')
+            self.handled.append(incident.id)
+
+        sync = canarytools.IncidentSync(self.console, self.path)
+        with self.assertRaises(IOError):
+            sync.run(handler)
+        sync.close()
+
+        self.assertEqual(self.restart(), 2)
+        self.assertEqual(self.handled, ['incident:1', 'incident:2', 'incident:3'])
+
+    def test_commit_first_does_not_hand_over_a_failed_incident_again(self):
+        def handler(incident):
+            raise IOError('sink unavailable')
+
+        sync = canarytools.IncidentSync(self.console, self.path)
+        with self.assertRaises(IOError):
+            sync.run(handler, commit_first=True)
+        sync.close()
+
+        self.assertEqual(self.restart(), 2)
+        self.assertEqual(self.handled, ['incident:2', 'incident:3'])
+
+    def test_delivery_key_identifies_a_version(self):
+        incident = self.console.incidents.incidents[0]
+        key = canarytools.IncidentSync.delivery_key(incident)
+        self.assertEqual(key, 'incident:1:2020-01-01T10:00:00+00:00')
+        incident.updated_std = START + datetime.timedelta(minutes=5)
+        self.assertNotEqual(canarytools.IncidentSync.delivery_key(incident), key)
+
+
+if __name__ == '__main__':
+    unittest.main()